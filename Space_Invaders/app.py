@@ -0,0 +1,78 @@
+"""Arranque explícito de la aplicación.
+
+Ningún módulo del juego toca la pantalla, el mezclador ni los ficheros de
+assets al importarse: la ventana se crea una sola vez en `bootstrap()` y las
+fuentes se construyen la primera vez que se piden. El menú llama a
+`first_frame()` después de mostrar su primer frame, que mide el tiempo hasta
+el primer frame y lanza la precarga de assets en segundo plano.
+"""
+import os
+import time
+from os.path import abspath, dirname, join
+
+import pygame
+
+# Se mide desde aquí: la importación de pygame en sí no depende de nosotros
+START_TIME = time.perf_counter()
+
+SCREEN_SIZE = (800, 600)  # El mismo que engine.SCREEN_WIDTH/SCREEN_HEIGHT
+FONT_FILE = join(abspath(dirname(__file__)), 'fonts', 'space_invaders.ttf')
+
+# Objetivos de tiempo hasta el primer frame del menú, en milisegundos
+FIRST_FRAME_TARGET_MS = 300
+FIRST_FRAME_TARGET_DUMMY_MS = 150  # Con SDL_VIDEODRIVER=dummy (CI)
+
+_screen = None
+_clock = None
+_fonts = {}
+_hud_fonts = {}
+first_frame_ms = None
+
+
+def bootstrap(caption="Space Invaders"):
+    global _screen, _clock
+    if _screen is None:
+        pygame.init()
+        _screen = pygame.display.set_mode(SCREEN_SIZE)
+        _clock = pygame.time.Clock()
+    pygame.display.set_caption(caption)
+    return _screen
+
+
+def screen():
+    return _screen if _screen is not None else bootstrap()
+
+
+def clock():
+    if _clock is None:
+        bootstrap()
+    return _clock
+
+
+def font(size):
+    if size not in _fonts:
+        _fonts[size] = pygame.font.Font(FONT_FILE, size)
+    return _fonts[size]
+
+
+def hud_font(size=24):
+    # Texto del HUD compuesto desde un atlas de glifos (ver text.py)
+    if size not in _hud_fonts:
+        from text import GlyphAtlas
+        _hud_fonts[size] = GlyphAtlas(FONT_FILE, size)
+    return _hud_fonts[size]
+
+
+def first_frame():
+    """Se llama tras presentar el primer frame del menú."""
+    global first_frame_ms
+    if first_frame_ms is not None:
+        return
+    first_frame_ms = (time.perf_counter() - START_TIME) * 1000
+    target = FIRST_FRAME_TARGET_DUMMY_MS if os.environ.get('SDL_VIDEODRIVER') == 'dummy' else FIRST_FRAME_TARGET_MS
+    if os.environ.get('SPACE_INVADERS_STARTUP'):
+        status = 'OK' if first_frame_ms <= target else 'LENTO'
+        print(f"Primer frame en {first_frame_ms:.0f} ms (objetivo {target} ms): {status}")
+
+    import game_objects
+    game_objects.warm_up()
@@ -0,0 +1,200 @@
+"""Paquete de assets precompilado.
+
+`python assets.py` empaqueta todos los sprites en un único atlas RGBA (con
+las versiones reescaladas que usa el menú ya hechas) y todos los sonidos como
+PCM ya decodificado en el formato del mezclador, en un solo fichero con un
+índice. En tiempo de ejecución `AssetPack` mapea ese fichero en memoria y
+sirve subsuperficies del atlas y objetos `Sound` sin decodificar ningún PNG,
+JPG ni WAV.
+
+Formato: b'SIPK', versión (u32), longitud del índice (u32), índice JSON y
+luego los bloques de datos alineados a 16 bytes.
+"""
+import io
+import json
+import mmap
+import os
+import struct
+import sys
+import wave
+from os.path import abspath, dirname, join
+
+import pygame
+
+BASE_PATH = abspath(dirname(__file__))
+IMAGE_PATH = join(BASE_PATH, 'images/')
+AUDIO_PATH = join(BASE_PATH, 'audio/')
+PACK_FILE = join(BASE_PATH, 'assets.pack')
+
+MAGIC = b'SIPK'
+VERSION = 1
+HEADER = struct.Struct('<4sII')
+
+# Nombre en el paquete -> (fichero, tamaño o None para el original)
+PACK_IMAGES = {
+    'ship': ('ship.png', None),
+    'laser': ('laser.png', None),
+    'enemylaser': ('enemylaser.png', None),
+    'enemy1_1': ('enemy1_1.png', None),
+    'enemy1_2': ('enemy1_2.png', None),
+    'enemy2_1': ('enemy2_1.png', None),
+    'enemy2_2': ('enemy2_2.png', None),
+    'enemy3_1': ('enemy3_1.png', None),
+    'enemy3_2': ('enemy3_2.png', None),
+    'mystery': ('mystery.png', None),
+    'explosiongreen': ('explosiongreen.png', None),
+    'explosionblue': ('explosionblue.png', None),
+    'explosionpurple': ('explosionpurple.png', None),
+    # Leyenda del menú
+    'enemy1_1@40x30': ('enemy1_1.png', (40, 30)),
+    'enemy2_1@45x35': ('enemy2_1.png', (45, 35)),
+    'enemy3_1@50x40': ('enemy3_1.png', (50, 40)),
+    'mystery@60x30': ('mystery.png', (60, 30)),
+    'background@800x600': ('background.jpg', (800, 600)),
+}
+
+PACK_SOUNDS = {
+    'shoot': 'shoot.wav',
+    'shoot2': 'shoot2.wav',
+    'invaderkilled': 'invaderkilled.wav',
+    'mysteryentered': 'mysteryentered.wav',
+    'mysterykilled': 'mysterykilled.wav',
+    'shipexplosion': 'shipexplosion.wav',
+}
+
+MIXER_FORMAT = (44100, -16, 2)  # El formato por defecto de pygame.mixer
+
+
+def scaled_name(name, size):
+    return f'{name}@{size[0]}x{size[1]}'
+
+
+# --- Construcción ---
+def pack_rects(sizes, width):
+    """Empaquetado por estanterías: devuelve {nombre: (x, y)} y el alto total."""
+    positions = {}
+    x = y = shelf = 0
+    for name, (w, h) in sorted(sizes.items(), key=lambda item: -item[1][1]):
+        if x + w > width:
+            x = 0
+            y += shelf
+            shelf = 0
+        positions[name] = (x, y)
+        x += w
+        shelf = max(shelf, h)
+    return positions, y + shelf
+
+
+def _align(buffer):
+    buffer.write(b'\0' * (-buffer.tell() % 16))
+
+
+def build_pack(path=PACK_FILE):
+    pygame.mixer.init(*MIXER_FORMAT)
+    images = {}
+    for name, (filename, size) in PACK_IMAGES.items():
+        img = pygame.image.load(join(IMAGE_PATH, filename))
+        images[name] = pygame.transform.scale(img, size) if size else img
+
+    sizes = {name: img.get_size() for name, img in images.items()}
+    width = max(w for w, h in sizes.values())
+    positions, height = pack_rects(sizes, width)
+    atlas = pygame.Surface((width, height), pygame.SRCALPHA)
+    for name, img in images.items():
+        atlas.blit(img, positions[name])
+
+    data = io.BytesIO()
+    index = {'atlas': {}, 'sprites': {}, 'sounds': {}, 'mixer': list(pygame.mixer.get_init())}
+    pixels = pygame.image.tobytes(atlas, 'RGBA')
+    index['atlas'] = {'offset': 0, 'length': len(pixels), 'size': [width, height]}
+    data.write(pixels)
+    for name, (x, y) in positions.items():
+        index['sprites'][name] = [x, y, *sizes[name]]
+
+    for name, filename in PACK_SOUNDS.items():
+        _align(data)
+        raw = pygame.mixer.Sound(join(AUDIO_PATH, filename)).get_raw()
+        index['sounds'][name] = {'offset': data.tell(), 'length': len(raw)}
+        data.write(raw)
+    pygame.mixer.quit()
+
+    index_bytes = json.dumps(index).encode('utf-8')
+    start = HEADER.size + len(index_bytes)
+    start += -start % 16
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(index_bytes)))
+        f.write(index_bytes)
+        f.write(b'\0' * (start - HEADER.size - len(index_bytes)))
+        f.write(data.getvalue())
+    os.replace(tmp, path)
+    return index
+
+
+# --- Lectura ---
+class AssetPack:
+    def __init__(self, path=PACK_FILE):
+        self.file = open(path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, index_length = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'{path} no es un paquete de assets v{VERSION}')
+        self.index = json.loads(self.map[HEADER.size:HEADER.size + index_length])
+        start = HEADER.size + index_length
+        self.data_start = start + (-start % 16)
+        self.atlas = None
+        self.surfaces = {}
+
+    @classmethod
+    def open(cls, path=PACK_FILE):
+        """Devuelve el paquete, o None si no se ha construido todavía."""
+        if not os.path.exists(path):
+            return None
+        return cls(path)
+
+    def _slice(self, entry):
+        start = self.data_start + entry['offset']
+        return self.map[start:start + entry['length']]
+
+    def __contains__(self, name):
+        return name in self.index['sprites']
+
+    def load_atlas(self):
+        """Lee el atlas de una vez y lo convierte al formato de la pantalla."""
+        if self.atlas is None:
+            entry = self.index['atlas']
+            raw = pygame.image.frombuffer(self._slice(entry), tuple(entry['size']), 'RGBA')
+            self.atlas = raw.convert_alpha() if pygame.display.get_surface() else raw.copy()
+        return self.atlas
+
+    def image(self, name):
+        surface = self.surfaces.get(name)
+        if surface is None:
+            surface = self.surfaces[name] = self.load_atlas().subsurface(self.index['sprites'][name])
+        return surface
+
+    def sound(self, name):
+        pcm = self._slice(self.index['sounds'][name])
+        frequency, size, channels = self.index['mixer']
+        if pygame.mixer.get_init() == (frequency, size, channels):
+            return pygame.mixer.Sound(buffer=pcm)
+        # El mezclador usa otro formato: se envuelve el PCM en un WAV y SDL lo convierte
+        wav = io.BytesIO()
+        with wave.open(wav, 'wb') as w:
+            w.setnchannels(channels)
+            w.setsampwidth(abs(size) // 8)
+            w.setframerate(frequency)
+            w.writeframes(pcm)
+        wav.seek(0)
+        return pygame.mixer.Sound(file=wav)
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+
+if __name__ == '__main__':
+    path = sys.argv[1] if len(sys.argv) > 1 else PACK_FILE
+    index = build_pack(path)
+    print(f"{path}: {len(index['sprites'])} sprites en un atlas de "
+          f"{index['atlas']['size'][0]}x{index['atlas']['size'][1]}, {len(index['sounds'])} sonidos")
@@ -0,0 +1,380 @@
+"""Reglas de un jugador del motor para muchas partidas a la vez, sobre arrays.
+
+`BatchGame` guarda N partidas 'single' como estructura de arrays (una fila
+por partida) y `step(actions)` las avanza todas un tick con operaciones de
+NumPy, sin un `Game.step` por partida. Aliens, láseres y naves misteriosas
+ocupan huecos de tamaño fijo con su array `alive`, y cada partida tiene sus
+cuatro barreras como rejillas de celdas.
+
+Las reglas son las de `engine.Game` a TICK_RATE y cada partida saca sus
+números de su propio `random.Random(seed)` en el mismo orden, así que con la
+misma semilla y las mismas entradas la partida es la misma tick a tick
+(`python batch.py --check` lo compara). Lo que solo sirve para dibujar
+(explosiones, animación, eventos de sonido) no se simula.
+
+    python batch.py 4096 1000     # 4096 partidas x 1000 ticks
+    python batch.py --check 64    # compara 64 partidas con engine.Game
+"""
+import argparse
+import random
+import time
+from math import ceil
+
+import numpy as np
+
+import levelpack
+from engine import (BLOCK_SIZE, EXTRA_VALUE, FIRE, LEFT, RIGHT, RULES, SCREEN_HEIGHT, SCREEN_WIDTH,
+                    SHIELD_CELLS, SIZES, Game, ms_to_ticks)
+from formation import KIND_HEIGHT, KIND_VALUE, KIND_WIDTH
+
+# --- Reglas (las de engine.Game a TICK_RATE) ---
+SHIP_W, SHIP_H = SIZES['ship']
+LASER_W, LASER_H = SIZES['laser']
+EXTRA_W, EXTRA_H = SIZES['mystery']
+SPAWN_X, SPAWN_Y = RULES['single']['spawns'][0]
+SHIP_X, SHIP_Y = SPAWN_X - SHIP_W // 2, SPAWN_Y - SHIP_H
+SHIP_SPEED = 5.0
+LIVES = 3
+LASER_COOLDOWN = ms_to_ticks(600)
+LASER_SPEED = -8.0
+ENEMY_LASER_SPEED = 6.0
+ENEMY_SHOOT_INTERVAL = ms_to_ticks(800)
+EXTRA_Y = 80
+EXTRA_SPEED = 3.0
+LEVEL_PAUSE = ms_to_ticks(RULES['single']['level_pause'])
+SHIELD_X = np.array([100 + i * 150 for i in range(4)], dtype=np.float64)
+SHIELD_Y = 450
+SHIELD_ROWS, SHIELD_COLS = SHIELD_CELLS.shape
+
+# Huecos por partida: cuántos pueden estar vivos a la vez según su velocidad y cada cuánto aparecen
+LASER_SLOTS = ceil((SCREEN_HEIGHT + 100) / -LASER_SPEED / LASER_COOLDOWN) + 1
+ENEMY_LASER_SLOTS = ceil((SCREEN_HEIGHT + 100) / ENEMY_LASER_SPEED / ENEMY_SHOOT_INTERVAL) + 1
+EXTRA_SLOTS = ceil((SCREEN_WIDTH + EXTRA_W + 100) / EXTRA_SPEED / ms_to_ticks(4000)) + 1
+
+
+def free_slots(alive, rows):
+    """Primer hueco libre de cada fila de `rows`."""
+    free = ~alive[rows]
+    slots = free.argmax(axis=1)
+    if not free[np.arange(len(rows)), slots].all():
+        raise RuntimeError('no quedan huecos libres')
+    return slots
+
+
+def overlap(ax, ay, aw, ah, bx, by, bw, bh):
+    return (ax < bx + bw) & (bx < ax + aw) & (ay < by + bh) & (by < ay + ah)
+
+
+class BatchGame:
+    def __init__(self, n, levels=None):
+        self.n = n
+        self.levels = levels if levels is not None else levelpack.get()
+        slots = max(len(self.levels[i]) for i in range(len(self.levels)))
+        self.rngs = [None] * n
+        # Partida
+        self.tick = np.zeros(n, dtype=np.int64)
+        self.pause = np.zeros(n, dtype=np.int64)
+        self.level = np.zeros(n, dtype=np.int64)
+        self.direction = np.ones(n, dtype=np.int64)
+        self.extra_interval = np.ones(n, dtype=np.int64)
+        self.over = np.zeros(n, dtype=bool)
+        self.victory = np.zeros(n, dtype=bool)
+        # Nave
+        self.ship_x = np.zeros(n, dtype=np.float64)
+        self.lives = np.zeros(n, dtype=np.int64)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.ship_alive = np.zeros(n, dtype=bool)
+        self.cooldown = np.zeros(n, dtype=np.int64)
+        # Aliens: posición inicial por alien y desplazamiento común por partida
+        self.kind = np.zeros((n, slots), dtype=np.int8)
+        self.x0 = np.zeros((n, slots), dtype=np.float64)
+        self.y0 = np.zeros((n, slots), dtype=np.float64)
+        self.w = np.zeros((n, slots), dtype=np.int32)
+        self.h = np.zeros((n, slots), dtype=np.int32)
+        self.alive = np.zeros((n, slots), dtype=bool)
+        self.count = np.zeros(n, dtype=np.int64)
+        self.dx = np.zeros(n, dtype=np.float64)
+        self.dy = np.zeros(n, dtype=np.float64)
+        # Extremos de la formación sin el desplazamiento: los laterales de los vivos (para el
+        # rebote) y los verticales del nivel (para descartar pronto los láseres que no llegan)
+        self.left = np.zeros(n, dtype=np.float64)
+        self.right = np.zeros(n, dtype=np.float64)
+        self.top = np.zeros(n, dtype=np.float64)
+        self.bottom = np.zeros(n, dtype=np.float64)
+        # Láseres propios, enemigos y naves misteriosas
+        self.laser_x = np.zeros((n, LASER_SLOTS))
+        self.laser_y = np.zeros((n, LASER_SLOTS))
+        self.laser_alive = np.zeros((n, LASER_SLOTS), dtype=bool)
+        self.enemy_x = np.zeros((n, ENEMY_LASER_SLOTS))
+        self.enemy_y = np.zeros((n, ENEMY_LASER_SLOTS))
+        self.enemy_alive = np.zeros((n, ENEMY_LASER_SLOTS), dtype=bool)
+        self.extra_x = np.zeros((n, EXTRA_SLOTS))
+        self.extra_speed = np.zeros((n, EXTRA_SLOTS))
+        self.extra_alive = np.zeros((n, EXTRA_SLOTS), dtype=bool)
+        self.shields = np.zeros((n, len(SHIELD_X), SHIELD_ROWS, SHIELD_COLS), dtype=bool)
+
+    # --- Inicio ---
+    def reset(self, rows, seeds, level=0):
+        """Empieza en cada fila de `rows` la partida de su semilla, como `Game('single', seed, level)`."""
+        for row, seed in zip(np.asarray(rows).tolist(), seeds):
+            rng = self.rngs[row] = random.Random(seed)
+            self.extra_interval[row] = ms_to_ticks(rng.randint(4000, 8000))
+            self.load_level(row, level)
+        self.tick[rows] = 0
+        self.pause[rows] = 0
+        self.direction[rows] = 1
+        self.over[rows] = False
+        self.victory[rows] = False
+        self.ship_x[rows] = SHIP_X
+        self.lives[rows] = LIVES
+        self.score[rows] = 0
+        self.ship_alive[rows] = True
+        self.cooldown[rows] = 0
+        self.laser_alive[rows] = False
+        self.enemy_alive[rows] = False
+        self.extra_alive[rows] = False
+        self.shields[rows] = SHIELD_CELLS
+
+    def load_level(self, row, level):
+        spawns = self.levels[level]
+        k = len(spawns)
+        self.level[row] = level
+        self.kind[row] = 0
+        self.kind[row, :k] = spawns['kind']
+        self.x0[row, :k] = spawns['x']
+        self.y0[row, :k] = spawns['y']
+        self.w[row] = KIND_WIDTH[self.kind[row]]
+        self.h[row] = KIND_HEIGHT[self.kind[row]]
+        self.alive[row] = False
+        self.alive[row, :k] = True
+        self.count[row] = k
+        self.dx[row] = 0.0
+        self.dy[row] = 0.0
+        self.top[row] = self.y0[row, :k].min()
+        self.bottom[row] = (self.y0[row, :k] + self.h[row, :k]).max()
+        self.update_extents([row])
+
+    def update_extents(self, rows):
+        alive = self.alive[rows]
+        self.left[rows] = np.where(alive, self.x0[rows], np.inf).min(axis=1)
+        self.right[rows] = np.where(alive, self.x0[rows] + self.w[rows], -np.inf).max(axis=1)
+
+    # --- Tick ---
+    def step(self, actions):
+        """Avanza un tick las partidas no terminadas; `actions[i]` son los bits de la partida i."""
+        actions = np.asarray(actions)
+        paused = ~self.over & (self.pause > 0)
+        self.pause -= paused
+        active = ~self.over & ~paused
+        if not active.any():
+            return
+        self.tick += active
+        self.spawn(active)
+        self.update_aliens(active)
+        self.update_ship(active, actions)
+        self.move(active)
+        self.player_collisions(active)
+        self.enemy_collisions(active)
+        self.check_level(active)
+
+    def spawn(self, active):
+        tick = self.tick
+        # Nave misteriosa (antes que el disparo: cada partida usa su RNG en el mismo orden que Game)
+        rows = np.flatnonzero(active & (tick % self.extra_interval == 0))
+        if len(rows):
+            right = np.array([self.rngs[row].choice(['left', 'right']) == 'right' for row in rows.tolist()])
+            slots = free_slots(self.extra_alive, rows)
+            self.extra_x[rows, slots] = np.where(right, SCREEN_WIDTH + 50, -50)
+            self.extra_speed[rows, slots] = np.where(right, -EXTRA_SPEED, EXTRA_SPEED)
+            self.extra_alive[rows, slots] = True
+        # Disparo enemigo desde el centro del n-ésimo alien vivo
+        rows = np.flatnonzero(active & (tick % ENEMY_SHOOT_INTERVAL == 0) & (self.count > 0))
+        if len(rows):
+            picks = np.array([self.rngs[row].randrange(count)
+                              for row, count in zip(rows.tolist(), self.count[rows].tolist())])
+            index = (np.cumsum(self.alive[rows], axis=1) <= picks[:, None]).sum(axis=1)
+            cx = np.trunc(self.x0[rows, index] + self.dx[rows] + self.w[rows, index] // 2)
+            cy = np.trunc(self.y0[rows, index] + self.dy[rows] + self.h[rows, index] // 2)
+            slots = free_slots(self.enemy_alive, rows)
+            self.enemy_x[rows, slots] = cx - LASER_W // 2
+            self.enemy_y[rows, slots] = cy - LASER_H // 2
+            self.enemy_alive[rows, slots] = True
+
+    def update_aliens(self, active):
+        self.dx += self.direction * active
+        # Como en Formation.at_edge; las posiciones son enteras, así que sumar dx al extremo es exacto
+        edge = active & ((self.right + self.dx >= SCREEN_WIDTH) | (self.left + self.dx <= 0))
+        self.direction[edge] *= -1
+        self.dy[edge] += 10
+
+    def update_ship(self, active, actions):
+        moving = active & self.ship_alive
+        step = ((actions & RIGHT) > 0).astype(np.int64) - ((actions & LEFT) > 0)
+        self.ship_x += np.where(moving, step * SHIP_SPEED, 0.0)
+        # El láser sale del centro de la nave antes de limitarla a la pantalla
+        rows = np.flatnonzero(moving & ((actions & FIRE) > 0) & (self.cooldown == 0))
+        if len(rows):
+            slots = free_slots(self.laser_alive, rows)
+            self.laser_x[rows, slots] = self.ship_x[rows] + SHIP_W // 2 - LASER_W // 2
+            self.laser_y[rows, slots] = SHIP_Y + SHIP_H // 2 - LASER_H // 2
+            self.laser_alive[rows, slots] = True
+            self.cooldown[rows] = LASER_COOLDOWN
+        self.ship_x = np.where(moving, np.clip(self.ship_x, 0, SCREEN_WIDTH - SHIP_W), self.ship_x)
+        self.cooldown -= moving & (self.cooldown > 0)
+
+    def move(self, active):
+        on = active[:, None]
+        self.laser_y += np.where(on & self.laser_alive, LASER_SPEED, 0.0)
+        self.laser_alive &= (self.laser_y > -50) & (self.laser_y < SCREEN_HEIGHT + 50)
+        self.extra_x += np.where(on & self.extra_alive, self.extra_speed, 0.0)
+        self.extra_alive &= (self.extra_x >= -EXTRA_W - 50) & (self.extra_x <= SCREEN_WIDTH + 50)
+        self.enemy_y += np.where(on & self.enemy_alive, ENEMY_LASER_SPEED, 0.0)
+        self.enemy_alive &= (self.enemy_y > -50) & (self.enemy_y < SCREEN_HEIGHT + 50)
+
+    # --- Colisiones ---
+    def player_collisions(self, active):
+        lasers = self.laser_alive & active[:, None]
+        y = self.laser_y
+        spent = np.zeros_like(lasers)
+        # Con aliens: cada láser mata todos los que toca. Solo se miran los que están a su altura
+        rows, slots = np.nonzero(lasers & (y < (self.bottom + self.dy)[:, None])
+                                 & (y + LASER_H > (self.top + self.dy)[:, None]))
+        if len(rows):
+            hits = self.alive[rows] & overlap(
+                self.laser_x[rows, slots, None], y[rows, slots, None], LASER_W, LASER_H,
+                self.x0[rows] + self.dx[rows, None], self.y0[rows] + self.dy[rows, None], self.w[rows], self.h[rows])
+            shots, aliens = np.nonzero(hits)
+            if len(shots):
+                hit_rows, aliens = np.divmod(np.unique(rows[shots] * self.alive.shape[1] + aliens),
+                                             self.alive.shape[1])
+                np.add.at(self.score, hit_rows, KIND_VALUE[self.kind[hit_rows, aliens]])
+                np.subtract.at(self.count, hit_rows, 1)
+                self.alive[hit_rows, aliens] = False
+                self.update_extents(np.unique(hit_rows))
+                spent[rows, slots] = hits.any(axis=1)
+        # Con nave misteriosa (también los láseres que acaban de dar a un alien)
+        rows, slots = np.nonzero(lasers & (y < EXTRA_Y + EXTRA_H) & (y + LASER_H > EXTRA_Y)
+                                 & self.extra_alive.any(axis=1)[:, None])
+        if len(rows):
+            hits = self.extra_alive[rows] & overlap(
+                self.laser_x[rows, slots, None], y[rows, slots, None], LASER_W, LASER_H,
+                self.extra_x[rows], EXTRA_Y, EXTRA_W, EXTRA_H)
+            shots, extras = np.nonzero(hits)
+            if len(shots):
+                hit_rows, extras = np.divmod(np.unique(rows[shots] * EXTRA_SLOTS + extras), EXTRA_SLOTS)
+                self.extra_alive[hit_rows, extras] = False
+                np.add.at(self.score, hit_rows, EXTRA_VALUE)
+                spent[rows, slots] |= hits.any(axis=1)
+        self.laser_alive &= ~spent
+
+    def enemy_collisions(self, active):
+        size = BLOCK_SIZE
+        cell_rows = np.arange(SHIELD_ROWS)
+        cell_cols = np.arange(SHIELD_COLS)
+        for slot in range(ENEMY_LASER_SLOTS):
+            # Con barreras: se borran las celdas que toca el láser
+            x, y = self.enemy_x[:, slot], self.enemy_y[:, slot]
+            rows = np.flatnonzero(active & self.enemy_alive[:, slot]
+                                  & (y + LASER_H > SHIELD_Y) & (y < SHIELD_Y + SHIELD_ROWS * size))
+            if len(rows):
+                lx, ly = x[rows, None], y[rows, None]
+                c0 = np.maximum((lx - SHIELD_X) // size, 0)
+                c1 = np.minimum((lx + LASER_W - 1 - SHIELD_X) // size + 1, SHIELD_COLS)
+                r0 = np.maximum((ly - SHIELD_Y) // size, 0)
+                r1 = np.minimum((ly + LASER_H - 1 - SHIELD_Y) // size + 1, SHIELD_ROWS)
+                region = (((cell_rows >= r0[..., None]) & (cell_rows < r1[..., None]))[..., :, None]
+                          & ((cell_cols >= c0[..., None]) & (cell_cols < c1[..., None]))[..., None, :])
+                cells = self.shields[rows]
+                eroded = (cells & region).any(axis=(2, 3)).any(axis=1)
+                self.shields[rows] = cells & ~region
+                self.enemy_alive[rows, slot] &= ~eroded
+            # Con la nave
+            hit = (active & self.enemy_alive[:, slot] & self.ship_alive
+                   & overlap(x, y, LASER_W, LASER_H, self.ship_x, SHIP_Y, SHIP_W, SHIP_H))
+            if hit.any():
+                self.enemy_alive[:, slot] &= ~hit
+                self.lives -= hit
+                dead = hit & (self.lives <= 0)
+                self.ship_alive &= ~dead
+                self.laser_alive[dead] = False
+                self.over |= dead
+
+    # --- Niveles ---
+    def check_level(self, active):
+        for row in np.flatnonzero(active & ~self.over & (self.count == 0)).tolist():
+            level = int(self.level[row]) + 1
+            if level >= len(self.levels):
+                self.over[row] = True
+                self.victory[row] = True
+                continue
+            self.load_level(row, level)
+            self.direction[row] = 1
+            self.pause[row] = LEVEL_PAUSE
+
+
+# --- Comprobación ---
+def state_of_game(game):
+    """Lo que decide una partida de `Game`, en la forma en que lo compara `check`."""
+    ship = game.ships[0]
+    aliens = game.aliens
+    return (game.tick, game.pause, game.level, game.direction, game.over, game.victory,
+            float(ship.x), ship.lives, ship.score, ship.alive, ship.cooldown,
+            tuple(np.flatnonzero(aliens.alive)), float(aliens.dx), float(aliens.dy),
+            sorted((float(l.x), float(l.y)) for l in game.lasers),
+            sorted((float(l.x), float(l.y)) for l in game.enemy_lasers),
+            sorted(float(e.x) for e in game.extras),
+            b''.join(shield.cells.tobytes() for shield in game.shields))
+
+
+def state_of_row(batch, i):
+    def pairs(x, y, alive):
+        return sorted((float(a), float(b)) for a, b in zip(x[i][alive[i]], y[i][alive[i]]))
+    return (int(batch.tick[i]), int(batch.pause[i]), int(batch.level[i]), int(batch.direction[i]),
+            bool(batch.over[i]), bool(batch.victory[i]),
+            float(batch.ship_x[i]), int(batch.lives[i]), int(batch.score[i]), bool(batch.ship_alive[i]),
+            int(batch.cooldown[i]),
+            tuple(np.flatnonzero(batch.alive[i])), float(batch.dx[i]), float(batch.dy[i]),
+            pairs(batch.laser_x, batch.laser_y, batch.laser_alive),
+            pairs(batch.enemy_x, batch.enemy_y, batch.enemy_alive),
+            sorted(float(x) for x in batch.extra_x[i][batch.extra_alive[i]]),
+            batch.shields[i].tobytes())
+
+
+def check(n=64, ticks=6000, seed=0, level=0, levels=None):
+    """Juega las mismas partidas con `Game` y con `BatchGame`; devuelve la primera diferencia o None."""
+    rng = np.random.default_rng(seed)
+    levels = levels if levels is not None else levelpack.get()
+    games = [Game('single', seed=seed + i, level=level, levels=levels) for i in range(n)]
+    batch = BatchGame(n, levels)
+    batch.reset(np.arange(n), range(seed, seed + n), level)
+    for tick in range(ticks):
+        # Acciones al azar pero pegajosas, para que las naves recorran la pantalla
+        if tick % 20 == 0:
+            actions = rng.integers(0, (LEFT | RIGHT | FIRE) + 1, n)
+        batch.step(actions)
+        for i, game in enumerate(games):
+            game.step([int(actions[i])])
+            if state_of_game(game) != state_of_row(batch, i):
+                return f'partida {i}, paso {tick}: {state_of_game(game)} != {state_of_row(batch, i)}'
+    return None
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Partidas de un jugador en bloque sobre arrays')
+    parser.add_argument('games', type=int, nargs='?', default=4096)
+    parser.add_argument('ticks', type=int, nargs='?', default=1000)
+    parser.add_argument('--check', type=int, metavar='PARTIDAS', help='compara con engine.Game')
+    args = parser.parse_args()
+    if args.check:
+        error = check(args.check)
+        print(error or f'{args.check} partidas iguales a engine.Game')
+        raise SystemExit(1 if error else 0)
+    batch = BatchGame(args.games)
+    batch.reset(np.arange(args.games), range(args.games))
+    actions = np.random.default_rng(0).integers(0, (LEFT | RIGHT | FIRE) + 1, (args.ticks, args.games))
+    start = time.perf_counter()
+    for tick_actions in actions:
+        batch.step(tick_actions)
+    elapsed = time.perf_counter() - start
+    print(f'{args.games} partidas x {args.ticks} ticks en {elapsed:.2f} s '
+          f'({args.games * args.ticks / elapsed:.0f} ticks/s, {int(batch.over.sum())} terminadas)')
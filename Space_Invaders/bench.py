@@ -0,0 +1,346 @@
+"""Banco de pruebas de rendimiento.
+
+Juega cada nivel del paquete activo (ver levelpack.py) y unos cuantos escenarios sintéticos
+(barreras siempre enteras, muchos láseres, muchas explosiones) con una
+entrada programada, un tick por frame y sin limitar los FPS. De cada frame
+mide las fases (eventos, aliens, colisiones, resto de la simulación, dibujo
+y `display.update`) y saca percentiles del tiempo de frame y la memoria.
+El resultado se guarda en JSON para comparar ejecuciones:
+
+    python bench.py                          # en una ventana
+    python bench.py --dummy -o antes.json    # sin pantalla (CI)
+    python bench.py --dummy --compare antes.json
+
+El modo de estrés (`--stress`) sustituye los escenarios por formaciones
+generadas de cientos a miles de aliens, con disparos enemigos cada tick y
+naves misteriosas cada medio segundo, y apunta el tiempo de frame frente al
+número de entidades hasta encontrar el punto en el que deja de mantener
+60 FPS. Con `--stress-floor N` termina con error si ese punto baja de N
+aliens, para vigilarlo en CI:
+
+    python bench.py --dummy --stress --counts 500 1000 2000 4000 --stress-floor 1000
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+PHASES = ('events', 'aliens', 'collisions', 'simulation', 'draw', 'present')
+PERCENTILES = (50, 90, 95, 99)
+STRESS_COUNTS = (250, 500, 1000, 2000, 4000, 8000)
+FRAME_BUDGET_MS = 1000 / 60
+
+
+# --- Entrada programada ---
+def sweep_policy(game, index):
+    """Barre la pantalla de lado a lado disparando sin parar."""
+    from engine import LEFT, RIGHT, FIRE
+    period = 240
+    return (RIGHT if (game.tick + index * period // 2) % period < period // 2 else LEFT) | FIRE
+
+
+# --- Escenarios ---
+def level_scenario(level):
+    def setup(game):
+        pass
+    return f'level-{level + 1:02d}', {'level': level}, setup
+
+
+def full_shields(game):
+    """Las barreras se reconstruyen cada tick y los aliens disparan sin parar."""
+    from engine import SHIELD_CELLS
+    game.enemy_shoot_interval = 2
+
+    def restore():
+        for shield in game.shields:
+            shield.cells[:] = SHIELD_CELLS
+            shield.version += 1
+    return restore
+
+
+def many_lasers(game):
+    """Sin enfriamiento del láser del jugador y con un disparo enemigo por tick."""
+    for ship in game.ships:
+        ship.laser_cooldown = 1
+    game.enemy_shoot_interval = 1
+
+
+def many_explosions(game, per_tick=8):
+    """Aparecen `per_tick` explosiones nuevas en cada tick."""
+    from engine import SCREEN_WIDTH
+
+    def spawn():
+        for i in range(per_tick):
+            x = (game.tick * 37 + i * 97) % SCREEN_WIDTH
+            y = 80 + (game.tick * 13 + i * 53) % 300
+            game.explosions.append(game.explosion_pool.acquire((x, y), 1 + i % 3, game.ticks(500)))
+    return spawn
+
+
+# Zona de la pantalla para las formaciones de estrés: por debajo del marcador
+# y por encima de las barreras (y=450), con margen para que marchen de lado
+STRESS_TOP = 60
+STRESS_BOTTOM = 420
+STRESS_MARGIN = 20
+STRESS_SPREAD = 0.75  # Fracción del ancho libre que ocupa la formación
+
+
+def stress_spawns(count):
+    """Tabla de apariciones (ver levelpack.py) con `count` aliens repartidos en la zona de estrés."""
+    import math
+    import numpy as np
+    from engine import SCREEN_WIDTH
+    from formation import KIND_HEIGHT, KIND_WIDTH
+    from levelpack import SPAWN
+    limit = np.iinfo(SPAWN['col']).max + 1  # Columnas y filas caben en un byte
+    width = (SCREEN_WIDTH - 2 * STRESS_MARGIN - KIND_WIDTH.max()) * STRESS_SPREAD
+    height = STRESS_BOTTOM - STRESS_TOP - KIND_HEIGHT.max()
+    # Separación igual en los dos ejes para que la rejilla llene la zona
+    pitch = math.sqrt(width * height / count)
+    columns = min(int(width // pitch) + 1, count, limit)
+    rows = math.ceil(count / columns)
+    if rows > limit:
+        raise ValueError(f'{count} aliens no caben en una rejilla de {limit}x{limit}')
+    index = np.arange(count)
+    spawns = np.zeros(count, dtype=SPAWN)
+    spawns['col'] = index % columns
+    spawns['row'] = index // columns
+    spawns['kind'] = 1 + spawns['row'] % 3
+    spawns['x'] = STRESS_MARGIN + spawns['col'] * (width / max(columns - 1, 1))
+    spawns['y'] = STRESS_TOP + spawns['row'] * (height / max(rows - 1, 1))
+    return spawns
+
+
+def stress(game):
+    """Un disparo enemigo por cada 250 aliens y tick, y nave misteriosa cada medio segundo."""
+    game.enemy_shoot_interval = 1
+    game.extra_interval = game.ticks(500)
+    shots = len(game.aliens) // 250
+
+    def fire():
+        for _ in range(shots):
+            if game.aliens:
+                game.alien_shoot()
+    return fire
+
+
+def scenarios(levels):
+    for level in levels:
+        yield level_scenario(level)
+    yield 'full-shields', {}, full_shields
+    yield 'many-lasers', {}, many_lasers
+    yield 'many-explosions', {}, many_explosions
+    yield 'multiplayer', {'mode': 'multi'}, lambda game: None
+
+
+# --- Medición ---
+def timed(method, totals, key):
+    clock = time.perf_counter
+
+    def wrapper(*args):
+        start = clock()
+        result = method(*args)
+        totals[key] += clock() - start
+        return result
+    return wrapper
+
+
+def new_game(options):
+    from engine import Game
+    levels = [stress_spawns(options['stress'])] if 'stress' in options else None
+    game = Game(options.get('mode', 'single'), seed=0, level=options.get('level', 0), levels=levels)
+    for ship in game.ships:
+        ship.lives = 10 ** 9  # Que el escenario no acabe por perder las vidas
+    return game
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * p / 100
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def run_scenario(options, setup, frames, screen, trace_memory=False):
+    import pygame
+    import app
+    from game_objects import draw_world
+    from renderer import DirtyRenderer
+
+    game = new_game(options)
+    per_tick = setup(game)
+    totals = dict.fromkeys(PHASES, 0.0)
+    game.update_aliens = timed(game.update_aliens, totals, 'aliens')
+    game.handle_collisions = timed(game.handle_collisions, totals, 'collisions')
+    renderer = DirtyRenderer(screen)
+    hud = app.hud_font()
+    players = range(len(game.ships))
+    clock = time.perf_counter
+
+    phases = {name: [] for name in PHASES}
+    frame_times = []
+    entities = 0
+    if trace_memory:
+        tracemalloc.start()
+    for _ in range(frames):
+        for name in PHASES:
+            totals[name] = 0.0
+        frame_start = clock()
+
+        pygame.event.pump()
+        pygame.event.get()
+        t = clock()
+        totals['events'] = t - frame_start
+
+        if per_tick:
+            per_tick()
+        game.step([sweep_policy(game, i) for i in players])
+        t2 = clock()
+        totals['simulation'] = t2 - t - totals['aliens'] - totals['collisions']
+
+        renderer.clear()
+        draw_world(renderer, game)
+        renderer.blit(hud.render(f'Score: {game.score}', (255, 255, 255)), (10, 10))
+        t3 = clock()
+        totals['draw'] = t3 - t2
+
+        renderer.present()
+        end = clock()
+        totals['present'] = end - t3
+
+        frame_times.append(end - frame_start)
+        for name in PHASES:
+            phases[name].append(totals[name])
+        entities = max(entities, len(game.aliens) + len(game.lasers) + len(game.enemy_lasers)
+                       + len(game.explosions) + len(game.extras))
+        if game.over:
+            break
+
+    python_peak = None
+    if trace_memory:
+        python_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    ms = 1000
+    return {
+        'frames': len(frame_times),
+        'level_reached': game.level + 1,
+        'max_entities': entities,
+        'frame_ms': {
+            'mean': sum(frame_times) / len(frame_times) * ms,
+            **{f'p{p}': percentile(frame_times, p) * ms for p in PERCENTILES},
+            'max': max(frame_times) * ms,
+        },
+        'phase_ms': {name: sum(values) / len(values) * ms for name, values in phases.items()},
+        'python_peak_kb': python_peak // 1024 if python_peak is not None else None,
+    }
+
+
+def peak_rss_kb():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == 'darwin' else rss  # macOS da bytes, Linux KB
+
+
+def run(frames=600, levels=None, memory_frames=120, only=None):
+    import pygame
+    import app
+    import levelpack
+
+    screen = app.bootstrap("Space Invaders - Benchmark")
+    levels = range(len(levelpack.get())) if levels is None else levels
+    results = {}
+    for name, options, setup in scenarios(levels):
+        if only and name not in only:
+            continue
+        result = run_scenario(options, setup, frames, screen)
+        # La memoria se mide aparte: tracemalloc ralentiza mucho el frame
+        result['python_peak_kb'] = run_scenario(options, setup, memory_frames, screen,
+                                                trace_memory=True)['python_peak_kb']
+        results[name] = result
+        print(f"{name:16} {result['frame_ms']['p50']:6.2f} ms p50 {result['frame_ms']['p99']:6.2f} ms p99 "
+              f"{result['python_peak_kb']:6d} KB")
+    return {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'pygame': pygame.version.ver,
+        'platform': platform.platform(),
+        'video_driver': pygame.display.get_driver(),
+        'frames_per_scenario': frames,
+        'peak_rss_kb': peak_rss_kb(),
+        'scenarios': results,
+    }
+
+
+def run_stress(frames=300, counts=STRESS_COUNTS):
+    """Tiempo de frame frente a entidades para cada tamaño de formación de `counts`."""
+    import app
+
+    screen = app.bootstrap("Space Invaders - Estrés")
+    rows = []
+    for count in counts:
+        result = run_scenario({'stress': count}, stress, frames, screen)
+        result['aliens'] = count
+        rows.append(result)
+        print(f"{count:6d} aliens {result['max_entities']:6d} entidades "
+              f"{result['frame_ms']['p50']:7.2f} ms p50 {result['frame_ms']['p95']:7.2f} ms p95  "
+              + ' '.join(f"{name} {ms:.2f}" for name, ms in result['phase_ms'].items()))
+    # El mayor tamaño que aguanta 60 FPS en el p95 (0 si ni el más pequeño llega)
+    holding = [row['aliens'] for row in rows if row['frame_ms']['p95'] <= FRAME_BUDGET_MS]
+    return {'frames_per_count': frames, 'rows': rows, 'max_aliens_at_60fps': max(holding, default=0)}
+
+
+def compare(old, new):
+    """Imprime la variación del p50 y el p99 por escenario respecto a `old`."""
+    for name, result in new['scenarios'].items():
+        before = old['scenarios'].get(name)
+        if before is None:
+            continue
+        changes = []
+        for key in ('p50', 'p99'):
+            a, b = before['frame_ms'][key], result['frame_ms'][key]
+            changes.append(f"{key} {a:6.2f} -> {b:6.2f} ms ({(b - a) / a * 100 if a else 0:+.0f}%)")
+        print(f"{name:16} " + '  '.join(changes))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--frames', type=int, default=600, help='frames por escenario')
+    parser.add_argument('--dummy', action='store_true', help='sin ventana (SDL_VIDEODRIVER=dummy)')
+    parser.add_argument('--only', nargs='*', help='escenarios a ejecutar')
+    parser.add_argument('-o', '--output', help='fichero JSON de resultados')
+    parser.add_argument('--compare', help='JSON de una ejecución anterior')
+    parser.add_argument('--stress', action='store_true', help='formaciones masivas en vez de los escenarios')
+    parser.add_argument('--counts', type=int, nargs='*', default=STRESS_COUNTS, help='aliens por formación')
+    parser.add_argument('--stress-floor', type=int, help='falla si no se mantienen 60 FPS con estos aliens')
+    args = parser.parse_args()
+
+    if args.dummy:
+        os.environ['SDL_VIDEODRIVER'] = 'dummy'
+        os.environ['SDL_AUDIODRIVER'] = 'dummy'
+    if args.stress:
+        report = run_stress(args.frames, args.counts)
+        output = args.output or time.strftime('bench-stress-%Y%m%d-%H%M%S.json')
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"60 FPS hasta {report['max_aliens_at_60fps']} aliens. Resultados en {output}")
+        if args.stress_floor is not None and report['max_aliens_at_60fps'] < args.stress_floor:
+            sys.exit(f"Por debajo del mínimo de {args.stress_floor} aliens a 60 FPS")
+        sys.exit()
+    report = run(args.frames, only=args.only)
+    output = args.output or time.strftime('bench-%Y%m%d-%H%M%S.json')
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Resultados en {output}")
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
@@ -0,0 +1,481 @@
+"""Núcleo de simulación de Space Invaders, sin pygame.
+
+Todo el estado de una partida (formación, láseres, escudos, nave misteriosa,
+puntuación y vidas) vive en `Game` y avanza un tick con `Game.step(inputs)`.
+No abre ventanas, no usa el mezclador ni el reloj de pared: el tiempo se
+cuenta en ticks, así que se puede simular sin pantalla y tan rápido como dé
+la CPU. Los front ends de pygame solo leen este estado para dibujarlo.
+"""
+import pickle
+import random
+import struct
+import sys
+import time
+import zlib
+
+import numpy as np
+
+from formation import Formation, KIND_VALUE
+import levelpack
+from pool import Pool
+from spatial import SpatialHash
+
+SCREEN_WIDTH, SCREEN_HEIGHT = 800, 600
+TICK_RATE = 60  # Ticks de simulación por segundo por defecto
+# Las velocidades están en píxeles por tick a TICK_RATE; con otra frecuencia
+# se escalan para que el juego vaya igual de rápido en tiempo real.
+
+# --- Bits de entrada por jugador ---
+LEFT = 1
+RIGHT = 2
+FIRE = 4
+
+# --- Tamaños de los sprites (los mismos que los PNG de images/) ---
+SIZES = {
+    'ship': (50, 48),
+    'laser': (5, 15),
+    'mystery': (60, 27),
+    'explosion': (40, 27),
+}
+
+EXTRA_VALUE = 50
+BLOCK_SIZE = 6
+GRID_CELL = 32  # Lado de las celdas de la rejilla de colisiones
+
+SHIELD_SHAPE = [
+    '     x     ',
+    '    xxx    ',
+    '  xxxxxxx  ',
+    ' xxxxxxxxx ',
+    'xxxxxxxxxxx',
+    'xxxxxxxxxxx',
+    'xxxxxxxxxxx',
+    'xxx     xxx',
+    'xx       xx'
+]
+SHIELD_CELLS = np.array([[char == 'x' for char in row] for row in SHIELD_SHAPE])
+
+# --- Reglas de cada modo de juego ---
+RULES = {
+    'single': {
+        'spawns': [(400, 580)],
+        'level_pause': 1000,  # Pausa entre niveles en milisegundos
+        'reset_direction': True,
+    },
+    'multi': {
+        'spawns': [(200, 580), (600, 580)],
+        'level_pause': 0,
+        'reset_direction': False,
+    },
+}
+
+
+def ms_to_ticks(ms, tick_rate=TICK_RATE):
+    return max(1, round(ms * tick_rate / 1000))
+
+
+def overlaps(a, b):
+    return a.x < b.x + b.w and b.x < a.x + a.w and a.y < b.y + b.h and b.y < a.y + a.h
+
+
+# --- Entidades ---
+class Entity:
+    def __init__(self, x, y, w, h):
+        self.x = x
+        self.y = y
+        self.w = w
+        self.h = h
+        self.alive = True
+        # Posición en el tick anterior, para interpolar al dibujar
+        self.px = x
+        self.py = y
+
+    def remember(self):
+        self.px = self.x
+        self.py = self.y
+
+    def place(self, x, y):
+        """Recoloca la entidad como recién creada (al sacarla de un pool)."""
+        self.x = self.px = x
+        self.y = self.py = y
+        self.alive = True
+
+    @property
+    def center(self):
+        return (self.x + self.w // 2, self.y + self.h // 2)
+
+    @property
+    def rect(self):
+        return (self.x, self.y, self.w, self.h)
+
+
+class Ship(Entity):
+    def __init__(self, midbottom, speed=5, laser_cooldown=ms_to_ticks(600)):
+        w, h = SIZES['ship']
+        super().__init__(midbottom[0] - w // 2, midbottom[1] - h, w, h)
+        self.speed = speed
+        self.lives = 3
+        self.score = 0
+        self.cooldown = 0  # Ticks que faltan para poder disparar otra vez
+        self.laser_cooldown = laser_cooldown
+
+
+# Láseres, naves misteriosas y explosiones salen de un `Pool`: `reset` recibe
+# los mismos argumentos que el constructor y deja la instancia como nueva.
+class Laser(Entity):
+    def __init__(self, center, speed, owner):
+        super().__init__(0, 0, *SIZES['laser'])
+        self.reset(center, speed, owner)
+
+    def reset(self, center, speed, owner):
+        self.place(center[0] - self.w // 2, center[1] - self.h // 2)
+        self.speed = speed
+        self.owner = owner  # Índice del jugador, o -1 si es un láser enemigo
+
+
+class Extra(Entity):
+    def __init__(self, side, speed=3):
+        super().__init__(0, 80, *SIZES['mystery'])
+        self.reset(side, speed)
+
+    def reset(self, side, speed=3):
+        self.place(SCREEN_WIDTH + 50 if side == 'right' else -50, 80)
+        self.speed = -speed if side == 'right' else speed
+
+
+class Explosion(Entity):
+    def __init__(self, center, kind, ttl=ms_to_ticks(500)):
+        super().__init__(0, 0, *SIZES['explosion'])
+        self.reset(center, kind, ttl)
+
+    def reset(self, center, kind, ttl=ms_to_ticks(500)):
+        self.place(center[0] - self.w // 2, center[1] - self.h // 2)
+        self.kind = kind
+        self.ttl = ttl
+
+
+class Shield(Entity):
+    """Barrera destructible: una rejilla de ocupación en vez de un sprite por bloque."""
+
+    def __init__(self, x, y, size=BLOCK_SIZE):
+        rows, cols = SHIELD_CELLS.shape
+        super().__init__(x, y, cols * size, rows * size)
+        self.size = size
+        self.cells = SHIELD_CELLS.copy()
+        self.version = 0  # Aumenta con cada daño para que el renderer sepa cuándo redibujar
+
+    def erode(self, x, y, w, h):
+        """Borra las celdas que toca el rectángulo. Devuelve True si quedaba alguna."""
+        rows, cols = self.cells.shape
+        s = self.size
+        c0 = max(int((x - self.x) // s), 0)
+        c1 = min(int((x + w - 1 - self.x) // s) + 1, cols)
+        r0 = max(int((y - self.y) // s), 0)
+        r1 = min(int((y + h - 1 - self.y) // s) + 1, rows)
+        if c0 >= c1 or r0 >= r1:
+            return False
+        region = self.cells[r0:r1, c0:c1]
+        if not region.any():
+            return False
+        region[...] = False
+        self.version += 1
+        return True
+
+
+def create_aliens(spawns):
+    return Formation.from_spawns(spawns)
+
+
+# --- Partida ---
+class Game:
+    """Estado completo de una partida que avanza de tick en tick."""
+
+    def __init__(self, mode='single', seed=None, level=0, tick_rate=TICK_RATE, levels=None):
+        rules = RULES[mode]
+        self.mode = mode
+        # Toda la aleatoriedad sale de esta semilla: misma semilla y mismas entradas, misma partida
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.rng = random.Random(self.seed)
+        self.tick_rate = tick_rate
+        self.scale = TICK_RATE / tick_rate  # Factor para las velocidades por tick
+        self.level_pause = self.ticks(rules['level_pause']) if rules['level_pause'] else 0
+        self.reset_direction = rules['reset_direction']
+        self.ships = [Ship(pos, 5 * self.scale, self.ticks(600)) for pos in rules['spawns']]
+
+        self.levels = levels if levels is not None else levelpack.get()
+        self.level = level
+        self.aliens = create_aliens(self.levels[level])
+        self.direction = 1
+        self.shields = [Shield(100 + i * 150, 450) for i in range(4)]
+
+        # Rejilla con lo que pueden tocar los láseres: barreras, naves y nave misteriosa
+        self.grid = SpatialHash(GRID_CELL)
+        for entity in self.shields + self.ships:
+            self.grid.insert(entity, *entity.rect)
+        self.lasers = []
+        self.enemy_lasers = []
+        self.extras = []
+        self.explosions = []
+        self.laser_pool = Pool(Laser)
+        self.extra_pool = Pool(Extra)
+        self.explosion_pool = Pool(Explosion)
+
+        self.tick = 0
+        self.pause = 0
+        self.anim_timer = self.ticks(500)
+        self.enemy_shoot_interval = self.ticks(800)
+        self.extra_interval = self.ticks(self.rng.randint(4000, 8000))
+        self.over = False
+        self.victory = False
+        self.events = []
+        self.collision_tests = 0  # Pruebas de colisión hechas (lo lee y reinicia metrics.py)
+
+    @property
+    def score(self):
+        return sum(ship.score for ship in self.ships)
+
+    def ticks(self, ms):
+        return ms_to_ticks(ms, self.tick_rate)
+
+    def remember(self):
+        """Guarda las posiciones actuales como las del tick anterior."""
+        for group in (self.ships, self.lasers, self.enemy_lasers, self.extras):
+            for entity in group:
+                entity.remember()
+        self.aliens.remember()
+
+    def checksum(self):
+        """CRC32 del estado que decide la partida, para comparar dos simulaciones."""
+        crc = zlib.crc32(struct.pack('<iiiii??', self.tick, self.pause, self.level, self.direction,
+                                     self.anim_timer, self.over, self.victory))
+        for ship in self.ships:
+            crc = zlib.crc32(struct.pack('<dii?i', ship.x, ship.lives, ship.score, ship.alive, ship.cooldown), crc)
+        aliens = self.aliens
+        crc = zlib.crc32(aliens.alive.tobytes(), crc)
+        crc = zlib.crc32(struct.pack('<dd', aliens.dx, aliens.dy), crc)
+        for group in (self.lasers, self.enemy_lasers, self.extras):
+            for entity in group:
+                crc = zlib.crc32(struct.pack('<dd', entity.x, entity.y), crc)
+        for shield in self.shields:
+            crc = zlib.crc32(shield.cells.tobytes(), crc)
+        return crc
+
+    def snapshot(self):
+        """Copia serializada de todo el estado (incluido el RNG) para volver a este tick."""
+        return pickle.dumps(self, pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def restore(snapshot):
+        return pickle.loads(snapshot)
+
+    def step(self, inputs=()):
+        """Avanza un tick. `inputs` trae un entero de bits por jugador.
+
+        Devuelve la lista de eventos del tick ('shoot', 'invaderkilled', ...)
+        para que el front end reproduzca los sonidos correspondientes.
+        """
+        self.events = []
+        if self.over:
+            return self.events
+        self.remember()
+        if self.pause:
+            self.pause -= 1
+            return self.events
+        self.tick += 1
+
+        # Temporizadores: nave misteriosa y disparos enemigos cada cierto número de ticks
+        if self.tick % self.extra_interval == 0:
+            extra = self.extra_pool.acquire(self.rng.choice(['left', 'right']), 3 * self.scale)
+            self.extras.append(extra)
+            self.grid.insert(extra, *extra.rect)
+            self.events.append('mysteryentered')
+        if self.tick % self.enemy_shoot_interval == 0 and self.aliens:
+            self.alien_shoot()
+
+        self.update_aliens()
+        for index, ship in enumerate(self.ships):
+            self.update_ship(index, ship, inputs[index] if index < len(inputs) else 0)
+        for laser in self.lasers:
+            self.move_laser(laser)
+        for extra in self.extras:
+            old = extra.rect
+            extra.x += extra.speed
+            if extra.x < -SIZES['mystery'][0] - 50 or extra.x > SCREEN_WIDTH + 50:
+                extra.alive = False
+                self.grid.remove(extra, *old)
+            else:
+                self.grid.move(extra, old, extra.rect)
+        for laser in self.enemy_lasers:
+            self.move_laser(laser)
+
+        self.handle_collisions()
+        self.check_level()
+
+        for explosion in self.explosions:
+            explosion.ttl -= 1
+            if explosion.ttl <= 0:
+                explosion.alive = False
+        self.prune()
+        return self.events
+
+    # --- Aliens ---
+    def update_aliens(self):
+        aliens = self.aliens
+        self.anim_timer -= 1
+        if self.anim_timer <= 0:
+            self.anim_timer = self.ticks(500)
+            aliens.flip_frames()
+        aliens.march(self.direction * self.scale)
+        if aliens.at_edge(SCREEN_WIDTH):
+            self.direction *= -1
+            aliens.descend(10)
+
+    def alien_shoot(self):
+        i = self.aliens.nth_alive(self.rng.randrange(len(self.aliens)))
+        self.enemy_lasers.append(self.laser_pool.acquire(self.aliens.center(i), 6 * self.scale, -1))
+        self.events.append('shoot2')
+
+    # --- Jugadores ---
+    def update_ship(self, index, ship, bits):
+        if not ship.alive:
+            return
+        old = ship.rect
+        dx = (1 if bits & RIGHT else 0) - (1 if bits & LEFT else 0)
+        ship.x += dx * ship.speed
+        if bits & FIRE and ship.cooldown == 0:
+            self.lasers.append(self.laser_pool.acquire(ship.center, -8 * self.scale, index))
+            ship.cooldown = ship.laser_cooldown
+            self.events.append('shoot')
+
+        # Limitar la nave a la pantalla
+        ship.x = min(max(ship.x, 0), SCREEN_WIDTH - ship.w)
+        self.grid.move(ship, old, ship.rect)
+        if ship.cooldown:
+            ship.cooldown -= 1
+
+    def move_laser(self, laser):
+        laser.y += laser.speed
+        if laser.y <= -50 or laser.y >= SCREEN_HEIGHT + 50:
+            laser.alive = False
+
+    # --- Colisiones ---
+    def handle_collisions(self):
+        tests = 0
+        for laser in self.lasers:
+            if not laser.alive:
+                continue
+            ship = self.ships[laser.owner]
+            # Con aliens
+            tests += 1
+            hit = self.aliens.hits(laser.x, laser.y, laser.w, laser.h)
+            if len(hit):
+                laser.alive = False
+                for i in hit:
+                    kind = int(self.aliens.kind[i])
+                    ship.score += int(KIND_VALUE[kind])
+                    self.explosions.append(self.explosion_pool.acquire(self.aliens.center(i), kind, self.ticks(500)))
+                    self.events.append('invaderkilled')
+                self.aliens.kill(hit)
+            # Con nave misteriosa (las barreras no frenan las balas del jugador)
+            nearby = self.grid.query(*laser.rect)
+            tests += len(nearby)
+            for extra in nearby:
+                if type(extra) is Extra and overlaps(laser, extra):
+                    extra.alive = False
+                    laser.alive = False
+                    self.grid.remove(extra, *extra.rect)
+                    ship.score += EXTRA_VALUE
+                    self.events.append('mysterykilled')
+
+        for laser in self.enemy_lasers:
+            if not laser.alive:
+                continue
+            nearby = self.grid.query(*laser.rect)
+            if not nearby:
+                continue
+            tests += len(nearby)
+            # Con barreras (las balas enemigas destruyen las barreras)
+            for shield in nearby:
+                if type(shield) is Shield and shield.erode(*laser.rect):
+                    laser.alive = False
+            if not laser.alive:
+                continue
+            # Con jugadores vivos, en orden de jugador
+            for ship in self.ships:
+                if ship in nearby and overlaps(laser, ship):
+                    laser.alive = False
+                    self.hit_ship(ship)
+                    break
+        self.collision_tests += tests
+
+    def hit_ship(self, ship):
+        ship.lives -= 1
+        self.events.append('shipexplosion')
+        if ship.lives <= 0:
+            ship.alive = False
+            self.grid.remove(ship, *ship.rect)
+            for laser in self.lasers:
+                if self.ships[laser.owner] is ship:
+                    laser.alive = False
+            if not any(s.alive for s in self.ships):
+                self.over = True
+                self.events.append('game_over')
+
+    # --- Niveles ---
+    def check_level(self):
+        if self.over or self.aliens:
+            return
+        self.level += 1
+        if self.level >= len(self.levels):
+            self.level = len(self.levels) - 1
+            self.over = True
+            self.victory = True
+            self.events.append('victory')
+            return
+        self.aliens = create_aliens(self.levels[self.level])
+        if self.reset_direction:
+            self.direction = 1
+        self.pause = self.level_pause
+        self.events.append('level')
+
+    def prune(self):
+        # Las entidades muertas vuelven a su pool para el siguiente disparo
+        self.lasers = self.laser_pool.collect(self.lasers)
+        self.enemy_lasers = self.laser_pool.collect(self.enemy_lasers)
+        self.extras = self.extra_pool.collect(self.extras)
+        self.explosions = self.explosion_pool.collect(self.explosions)
+
+
+# --- Modo sin pantalla ---
+def random_policy(rng):
+    def policy(game, index):
+        return rng.choice((0, LEFT, RIGHT, FIRE, LEFT | FIRE, RIGHT | FIRE))
+    return policy
+
+
+def play(game, policy, max_ticks=None):
+    """Juega `game` hasta que termine (o hasta `max_ticks`) tan rápido como se pueda."""
+    players = range(len(game.ships))
+    while not game.over and (max_ticks is None or game.tick < max_ticks):
+        game.step([policy(game, i) for i in players])
+    return game
+
+
+def run_headless(games=100, mode='single', seed=0, max_ticks=20000):
+    rng = random.Random(seed)
+    policy = random_policy(rng)
+    ticks = 0
+    start = time.perf_counter()
+    for i in range(games):
+        game = play(Game(mode, seed=seed + i), policy, max_ticks)
+        ticks += game.tick
+    elapsed = time.perf_counter() - start
+    return {'games': games, 'ticks': ticks, 'seconds': elapsed}
+
+
+if __name__ == '__main__':
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    mode = sys.argv[2] if len(sys.argv) > 2 else 'single'
+    result = run_headless(games, mode)
+    print(f"{result['games']} partidas, {result['ticks']} ticks en {result['seconds']:.2f} s "
+          f"({result['ticks'] / result['seconds']:.0f} ticks/s)")
@@ -0,0 +1,196 @@
+"""Entorno para entrenar agentes, al estilo de Gym.
+
+`SpaceInvadersEnv` juega una partida con las reglas de un jugador del motor
+(las mismas que `single_player.py`) sin teclado ni pantalla:
+
+    env = SpaceInvadersEnv(seed=0)
+    obs, info = env.reset()
+    obs, reward, terminated, truncated, info = env.step(LEFT | FIRE)
+
+La acción es un entero de 0 a 7 con los bits LEFT, RIGHT y FIRE del motor.
+La observación es una rejilla de `OBS_SHAPE` (canal, fila, columna) con
+cuántos aliens, láseres enemigos, láseres propios y naves hay en cada celda
+de CELL píxeles. La recompensa es la puntuación ganada en el paso, menos
+`life_penalty` por cada vida perdida.
+
+`VectorEnv` avanza N partidas en cada llamada sobre `batch.BatchGame`, que
+guarda su estado como arrays (una fila por partida) y simula un tick de
+todas con operaciones de NumPy, y devuelve observaciones, recompensas y
+finales con una fila por partida. Con la misma semilla juega exactamente
+las mismas partidas que `SpaceInvadersEnv`. Las partidas que terminan se
+reinician solas con la siguiente semilla.
+
+Los arrays devueltos son copias: se pueden guardar (en un buffer de
+repetición, para apilar frames...) sin que el siguiente paso los cambie.
+"""
+import sys
+import time
+
+import numpy as np
+
+from batch import LASER_H, LASER_W, SHIP_H, SHIP_W, SHIP_Y, BatchGame
+from engine import FIRE, LEFT, RIGHT, SCREEN_HEIGHT, SCREEN_WIDTH, Game
+
+ACTIONS = (LEFT | RIGHT | FIRE) + 1  # Todas las combinaciones de LEFT, RIGHT y FIRE
+CELL = 40
+ALIENS, ENEMY_LASERS, LASERS, SHIPS = range(4)
+OBS_SHAPE = (4, SCREEN_HEIGHT // CELL, SCREEN_WIDTH // CELL)
+MAX_STEPS = 20000
+
+
+def observe(games, out):
+    """Rellena `out[i]` con la rejilla de `games[i]`."""
+    # Los aliens ya están en arrays; el resto se junta en listas y se convierte una vez
+    alien_x, alien_y, alien_counts = [], [], []
+    envs, channels, xs, ys = [], [], [], []
+    for env, game in enumerate(games):
+        aliens = game.aliens
+        alive = aliens.alive
+        alien_x.append(aliens.x[alive] + aliens.w[alive] / 2)
+        alien_y.append(aliens.y[alive] + aliens.h[alive] / 2)
+        alien_counts.append(len(alien_x[-1]))
+        for channel, group in ((ENEMY_LASERS, game.enemy_lasers), (LASERS, game.lasers), (SHIPS, game.ships)):
+            for entity in group:
+                if entity.alive:
+                    envs.append(env)
+                    channels.append(channel)
+                    xs.append(entity.x + entity.w // 2)
+                    ys.append(entity.y + entity.h // 2)
+
+    env = np.concatenate((np.repeat(np.arange(len(games)), alien_counts), envs)).astype(np.intp)
+    channel = np.concatenate((np.full(len(env) - len(envs), ALIENS), channels)).astype(np.intp)
+    rows = np.clip(np.concatenate(alien_y + [ys]) // CELL, 0, OBS_SHAPE[1] - 1).astype(np.intp)
+    cols = np.clip(np.concatenate(alien_x + [xs]) // CELL, 0, OBS_SHAPE[2] - 1).astype(np.intp)
+    return fill(out, env, channel, rows, cols)
+
+
+def fill(out, env, channel, rows, cols):
+    """Pone en `out` cuántas entidades caen en cada celda (env, canal, fila, columna)."""
+    flat = np.sort(np.ravel_multi_index((env, channel, rows, cols), out.shape))
+    # Ordenadas, las repetidas quedan juntas: se cuentan sin recorrer la rejilla entera
+    starts = np.flatnonzero(np.diff(flat, prepend=-1))
+    out.fill(0)
+    out.reshape(-1)[flat[starts]] = np.diff(np.r_[starts, len(flat)])
+    return out
+
+
+def observe_batch(batch, out):
+    """La misma rejilla que `observe`, a partir de los arrays de `BatchGame`."""
+    envs, channels, xs, ys = [], [], [], []
+    for channel, alive, x, y in (
+            (ALIENS, batch.alive, batch.x0 + batch.dx[:, None] + batch.w / 2,
+             batch.y0 + batch.dy[:, None] + batch.h / 2),
+            (ENEMY_LASERS, batch.enemy_alive, batch.enemy_x + LASER_W // 2, batch.enemy_y + LASER_H // 2),
+            (LASERS, batch.laser_alive, batch.laser_x + LASER_W // 2, batch.laser_y + LASER_H // 2),
+            (SHIPS, batch.ship_alive, batch.ship_x + SHIP_W // 2, np.full(batch.n, SHIP_Y + SHIP_H // 2))):
+        env = np.nonzero(alive)[0]
+        envs.append(env)
+        channels.append(np.full(len(env), channel))
+        xs.append(x[alive])
+        ys.append(y[alive])
+    # Truncar antes de dividir da la misma celda que `observe` (las negativas acaban en 0 igual)
+    rows = np.clip(np.concatenate(ys).astype(np.intp) // CELL, 0, OBS_SHAPE[1] - 1)
+    cols = np.clip(np.concatenate(xs).astype(np.intp) // CELL, 0, OBS_SHAPE[2] - 1)
+    return fill(out, np.concatenate(envs), np.concatenate(channels), rows, cols)
+
+
+class SpaceInvadersEnv:
+    def __init__(self, seed=None, level=0, frame_skip=1, life_penalty=0.0, max_steps=MAX_STEPS):
+        self.seed = seed
+        self.level = level
+        self.frame_skip = frame_skip  # Ticks que dura cada acción
+        self.life_penalty = life_penalty
+        self.max_steps = max_steps
+        self.game = None
+        self.steps = 0
+        self.obs = np.zeros((1,) + OBS_SHAPE, dtype=np.uint8)
+
+    def reset(self, seed=None):
+        if seed is not None:
+            self.seed = seed
+        self.game = Game('single', seed=self.seed, level=self.level)
+        if self.seed is not None:
+            self.seed += 1  # El siguiente reinicio juega otra partida, también reproducible
+        self.steps = 0
+        return observe([self.game], self.obs)[0].copy(), self.info()
+
+    def step(self, action):
+        game = self.game
+        ship = game.ships[0]
+        score, lives = ship.score, ship.lives
+        inputs = [int(action)]
+        for _ in range(self.frame_skip):
+            game.step(inputs)
+            if game.over:
+                break
+        self.steps += 1
+        reward = ship.score - score - self.life_penalty * (lives - ship.lives)
+        truncated = not game.over and self.steps >= self.max_steps
+        return observe([game], self.obs)[0].copy(), float(reward), game.over, truncated, self.info()
+
+    def info(self):
+        game = self.game
+        ship = game.ships[0]
+        return {'score': ship.score, 'lives': ship.lives, 'level': game.level, 'tick': game.tick,
+                'victory': game.victory}
+
+
+class VectorEnv:
+    def __init__(self, n, seed=0, level=0, frame_skip=1, life_penalty=0.0, max_steps=MAX_STEPS, levels=None):
+        self.n = n
+        self.level = level
+        self.frame_skip = frame_skip
+        self.life_penalty = life_penalty
+        self.max_steps = max_steps
+        self.next_seed = seed
+        self.batch = BatchGame(n, levels)
+        # Estado por campo, una fila por partida
+        self.obs = np.zeros((n,) + OBS_SHAPE, dtype=np.uint8)
+        self.steps = np.zeros(n, dtype=np.int32)
+        self.final_scores = np.full(n, -1, dtype=np.int32)  # Puntuación de la partida que acaba de terminar
+
+    def new_games(self, rows):
+        self.batch.reset(rows, range(self.next_seed, self.next_seed + len(rows)), self.level)
+        self.next_seed += len(rows)
+        self.steps[rows] = 0
+
+    def reset(self):
+        self.new_games(np.arange(self.n))
+        self.final_scores.fill(-1)
+        return observe_batch(self.batch, self.obs).copy()
+
+    def step(self, actions):
+        """Aplica `actions[i]` a la partida i; devuelve obs, recompensas, terminadas y truncadas."""
+        batch = self.batch
+        actions = np.asarray(actions)
+        scores, lives = batch.score.copy(), batch.lives.copy()
+        for _ in range(self.frame_skip):
+            batch.step(actions)  # Las terminadas ya no avanzan
+        self.steps += 1
+        rewards = (batch.score - scores - self.life_penalty * (lives - batch.lives)).astype(np.float32)
+        terminated = batch.over.copy()
+        truncated = ~terminated & (self.steps >= self.max_steps)
+        done = terminated | truncated
+        self.final_scores.fill(-1)
+        self.final_scores[done] = batch.score[done]
+        # Las que terminan empiezan otra; su observación ya es la de la partida nueva
+        rows = np.flatnonzero(done)
+        if len(rows):
+            self.new_games(rows)
+        return observe_batch(batch, self.obs).copy(), rewards, terminated, truncated
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 256
+    steps = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    rng = np.random.default_rng(0)
+    env = VectorEnv(n)
+    env.reset()
+    start = time.perf_counter()
+    total = 0.0
+    for _ in range(steps):
+        _, rewards, _, _ = env.step(rng.integers(0, ACTIONS, n))
+        total += rewards.sum()
+    elapsed = time.perf_counter() - start
+    print(f'{n} entornos x {steps} pasos en {elapsed:.2f} s ({n * steps / elapsed:.0f} pasos/s, '
+          f'recompensa total {total:.0f})')
@@ -0,0 +1,123 @@
+"""Formación de aliens guardada como arrays de NumPy.
+
+Cada alien es un índice en los arrays `x`, `y`, `kind` y `alive`. Lo que
+comparten los aliens de un tipo (tamaño, puntos, sprites) está una sola vez
+en `ALIEN_TYPES`, y la animación es una fase común a toda la formación.
+Marchar, detectar el borde, bajar y alternar la animación son una sola
+operación vectorizada sobre toda la formación.
+
+Como la formación se mueve como un bloque rígido, los aliens se registran en
+una `SpatialHash` con sus coordenadas iniciales y solo se acumula el
+desplazamiento (`dx`, `dy`); la rejilla no hay que rehacerla al moverse.
+"""
+import numpy as np
+
+from spatial import SpatialHash
+
+
+class AlienType:
+    """Datos compartidos por todos los aliens de un tipo."""
+    __slots__ = ('kind', 'width', 'height', 'value', 'frames', 'explosion')
+
+    def __init__(self, kind, width, height, value, frames, explosion):
+        self.kind = kind
+        self.width = width
+        self.height = height
+        self.value = value
+        self.frames = frames  # Nombre del sprite de cada fase de la animación
+        self.explosion = explosion
+
+
+ALIEN_TYPES = {
+    1: AlienType(1, 40, 39, 10, ('enemy1_1', 'enemy1_2'), 'explosionpurple'),
+    2: AlienType(2, 40, 29, 20, ('enemy2_1', 'enemy2_2'), 'explosionblue'),
+    3: AlienType(3, 40, 29, 30, ('enemy3_1', 'enemy3_2'), 'explosiongreen'),
+}
+
+# Las mismas columnas como arrays para las operaciones vectorizadas (índice = tipo, el 0 no se usa)
+KIND_WIDTH = np.array([0] + [t.width for t in ALIEN_TYPES.values()], dtype=np.int32)
+KIND_HEIGHT = np.array([0] + [t.height for t in ALIEN_TYPES.values()], dtype=np.int32)
+KIND_VALUE = np.array([0] + [t.value for t in ALIEN_TYPES.values()], dtype=np.int32)
+
+GRID_CELL = 64
+
+
+class Formation:
+    def __init__(self, kinds, xs, ys):
+        self.kind = np.asarray(kinds, dtype=np.int8)
+        # Posiciones iniciales; la actual es siempre inicial + desplazamiento
+        self.x0 = np.asarray(xs, dtype=np.float64)
+        self.y0 = np.asarray(ys, dtype=np.float64)
+        self.x = self.x0.copy()
+        self.y = self.y0.copy()
+        self.w = KIND_WIDTH[self.kind]
+        self.h = KIND_HEIGHT[self.kind]
+        self.alive = np.ones(len(self.kind), dtype=bool)
+        self.phase = 0  # Fase de la animación, la misma para todos los aliens
+        self.count = len(self.kind)
+
+        # Rejilla en coordenadas locales de la formación
+        self.dx = 0
+        self.dy = 0
+        self.pdx = 0  # Desplazamiento del tick anterior, para interpolar al dibujar
+        self.pdy = 0
+        self.grid = SpatialHash(GRID_CELL)
+        for i in range(self.count):
+            self.grid.insert(i, self.x0[i], self.y0[i], self.w[i], self.h[i])
+
+    @classmethod
+    def from_spawns(cls, spawns):
+        """Formación a partir de la tabla de apariciones de un nivel (ver levelpack.py)."""
+        return cls(spawns['kind'], spawns['x'], spawns['y'])
+
+    def __len__(self):
+        return self.count
+
+    def __bool__(self):
+        return self.count > 0
+
+    # --- Movimiento ---
+    def remember(self):
+        self.pdx = self.dx
+        self.pdy = self.dy
+
+    def march(self, direction):
+        self.dx += direction
+        np.add(self.x0, self.dx, out=self.x)
+
+    def at_edge(self, screen_width):
+        return bool(np.any(self.alive & ((self.x + self.w >= screen_width) | (self.x <= 0))))
+
+    def descend(self, dy=10):
+        self.dy += dy
+        np.add(self.y0, self.dy, out=self.y)
+
+    def flip_frames(self):
+        self.phase ^= 1
+
+    # --- Consultas ---
+    def indices(self):
+        return np.flatnonzero(self.alive)
+
+    def nth_alive(self, n):
+        return int(self.indices()[n])
+
+    def center(self, i):
+        return (int(self.x[i] + self.w[i] // 2), int(self.y[i] + self.h[i] // 2))
+
+    def hits(self, x, y, w, h):
+        """Índices de los aliens vivos que solapan el rectángulo dado."""
+        candidates = self.grid.query(x - self.dx, y - self.dy, w, h)
+        if not candidates:
+            return np.empty(0, dtype=np.intp)
+        idx = np.fromiter(sorted(candidates), dtype=np.intp, count=len(candidates))
+        ax, ay = self.x[idx], self.y[idx]
+        mask = (ax < x + w) & (x < ax + self.w[idx]) & (ay < y + h) & (y < ay + self.h[idx])
+        return idx[mask]
+
+    def kill(self, indices):
+        # Solo se matan aliens vivos (los que devuelve `hits`)
+        self.alive[indices] = False
+        self.count -= len(indices)
+        for i in indices:
+            self.grid.remove(int(i), self.x0[i], self.y0[i], self.w[i], self.h[i])
@@ -1,8 +1,11 @@
-import json
+import importlib
 import os
+import threading
 import pygame
-from random import choice
+from weakref import WeakKeyDictionary
 from os.path import abspath, dirname, join
+from assets import AssetPack
+from scores import ScoreStore
 
 # --- Paths ---
 BASE_PATH = abspath(dirname(__file__))
@@ -15,318 +18,196 @@ WHITE = (255, 255, 255)
 GREEN = (78, 255, 87)
 RED = (237, 28, 36)
 
-# --- Initialize ---
-pygame.init()
-pygame.font.init()
-pygame.mixer.init()
-SCREEN_WIDTH, SCREEN_HEIGHT = 800, 600
-SCREEN = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("Space Invaders - Single Player")
-CLOCK = pygame.time.Clock()
-FONT = pygame.font.Font(join(FONT_PATH, 'space_invaders.ttf'), 24)
-
-# --- Load image utility ---
-def load_image(name, scale=None):
-    img = pygame.image.load(join(IMAGE_PATH, name)).convert_alpha()
-    if scale:
-        img = pygame.transform.scale(img, scale)
-    return img
-
-# --- Load images ---
-IMAGES = {
-    'ship': load_image('ship.png'),
-    'laser': load_image('laser.png'),
-    'enemylaser': load_image('enemylaser.png'),
-    'enemy1_1': load_image('enemy1_1.png'),
-    'enemy1_2': load_image('enemy1_2.png'),
-    'enemy2_1': load_image('enemy2_1.png'),
-    'enemy2_2': load_image('enemy2_2.png'),
-    'enemy3_1': load_image('enemy3_1.png'),
-    'enemy3_2': load_image('enemy3_2.png'),
-    'mystery': load_image('mystery.png'),
-    'explosiongreen': load_image('explosionGreen.png'),
-    'explosionblue': load_image('explosionBlue.png'),
-    'explosionpurple': load_image('explosionPurple.png'),
+# --- Assets bajo demanda ---
+# Nada se carga al importar el módulo: cada imagen o sonido se lee la primera
+# vez que se pide, o antes si warm_up() ya lo dejó decodificado. Si existe
+# assets.pack (python assets.py) todo sale de ahí; si no, de los ficheros sueltos.
+IMAGE_FILES = {
+    'ship': 'ship.png',
+    'laser': 'laser.png',
+    'enemylaser': 'enemylaser.png',
+    'enemy1_1': 'enemy1_1.png',
+    'enemy1_2': 'enemy1_2.png',
+    'enemy2_1': 'enemy2_1.png',
+    'enemy2_2': 'enemy2_2.png',
+    'enemy3_1': 'enemy3_1.png',
+    'enemy3_2': 'enemy3_2.png',
+    'mystery': 'mystery.png',
+    'explosiongreen': 'explosiongreen.png',
+    'explosionblue': 'explosionblue.png',
+    'explosionpurple': 'explosionpurple.png',
+    'background': 'background.jpg',
 }
 
-SOUNDS = {
-    'shoot': pygame.mixer.Sound(join(AUDIO_PATH, 'shoot.wav')),
-    'shoot2': pygame.mixer.Sound(join(AUDIO_PATH, 'shoot2.wav')),
-    'invaderkilled': pygame.mixer.Sound(join(AUDIO_PATH, 'invaderkilled.wav')),
-    'mysteryentered': pygame.mixer.Sound(join(AUDIO_PATH, 'mysteryentered.wav')),
-    'mysterykilled': pygame.mixer.Sound(join(AUDIO_PATH, 'mysterykilled.wav')),
-    'shipexplosion': pygame.mixer.Sound(join(AUDIO_PATH, 'shipexplosion.wav')),
+SOUND_FILES = {
+    'shoot': 'shoot.wav',
+    'shoot2': 'shoot2.wav',
+    'invaderkilled': 'invaderkilled.wav',
+    'mysteryentered': 'mysteryentered.wav',
+    'mysterykilled': 'mysterykilled.wav',
+    'shipexplosion': 'shipexplosion.wav',
 }
 
+_pack = False  # False: todavía no se ha buscado el paquete
+# warm_up() carga desde otro hilo: abrir el paquete y rellenar las cachés va
+# siempre con este cerrojo, así que cada cosa se carga una sola vez
+_assets_lock = threading.RLock()
 
-# --- Función para cargar el ranking ---
-
-SINGLE_RANKING_FILE = os.path.join(os.path.dirname(__file__), 'single_ranking.json')
-
-def single_load_ranking():
-    if os.path.exists(SINGLE_RANKING_FILE):
-        with open(SINGLE_RANKING_FILE, 'r') as f:
-            return json.load(f)
-    return []
+def asset_pack():
+    global _pack
+    with _assets_lock:
+        if _pack is False:
+            _pack = AssetPack.open()
+        return _pack
 
-def single_save_score(name, score):
-    single_ranking = single_load_ranking()
-    single_ranking.append({'name': name, 'score': score})
-    single_ranking = sorted(single_ranking, key=lambda x: x['score'], reverse=True)[:5]  # Top 5
-    with open(SINGLE_RANKING_FILE, 'w') as f:
-        json.dump(single_ranking, f)
+class ImageCache(dict):
+    """Imágenes por nombre; 'nombre@AxB' es la versión reescalada a AxB."""
 
-
-# --- Función para cargar el ranking ---
-MULTI_RANKING_FILE = os.path.join(os.path.dirname(__file__), 'multi_ranking.json')
-
-def multi_load_ranking():
-    if os.path.exists(MULTI_RANKING_FILE):
-        with open(MULTI_RANKING_FILE, 'r') as f:
-            return json.load(f)
-    return []
-
-def multi_save_score(name, score):
-    multi_ranking = multi_load_ranking()
-    multi_ranking.append({'name': name, 'score': score})
-    multi_ranking = sorted(multi_ranking, key=lambda x: x['score'], reverse=True)[:5]  # Top 5
-    with open(MULTI_RANKING_FILE, 'w') as f:
-        json.dump(multi_ranking, f)
-
-
-LEVEL_PATTERNS = [
-    [
-        '  111111  ',
-        '  222222  ',
-        '3333333333',
-    ],
-    [
-        '  222222  ',
-        '  111111  ',
-        '3333333333',
-        '   2222   ',
-    ],
-    [
-        '1111111111',
-        '  222222  ',
-        '   3333   ',
-    ],
-    [
-        '   1111   ',
-        ' 22222222 ',
-        '  333333  ',
-        '   1111   ',
-    ],
-    [
-        '    1     ',
-        '   222    ',
-        '  33333   ',
-        ' 2222222  ',
-    ],
-    [
-        '1 1 1 1 1 ',
-        ' 2 2 2 2 2',
-        ' 33333333',
-    ],
-    [
-        '1111111111',
-        '2222222222',
-        '3333333333',
-    ],
-    [
-        '1 3 3 3 1 ',
-        '3 1 2 1 3',
-        '2 3 1 3 2',
-    ],
-    [
-        '1 1 1 1 1 ',
-        '2 2 2 2 2 ',
-        '3 3 3 3 3 ',
-        '1 2 3 2 1 ',
-    ],
-    [
-        '    111   ',
-        '  2222222 ',
-        ' 333333333',
-        '    111   ',
-    ],
-    [
-        '1 2 3 2 1 ',
-        '3 2 1 2 3 ',
-        '1 2 3 2 1 ',
-        '3 2 1 2 3 ',
-    ],
-    [
-        '1   1  333 ',
-        ' 1 1   3  3',
-        '  1    3  3',
-        ' 1 1   3  3',
-        '1   1  333 ',
-    ],
-    [
-        '1111111111',
-        '   2222   ',
-        '3333333333',
-        '   2222   ',
-    ],
-    [
-        '1 3 1 3 1 ',
-        '2 2 2 2 2 ',
-        '3 1 3 1 3 ',
-    ],
-    [
-        ' 1 2 3 1 2',
-        '3 1 2 3 1 ',
-        ' 2 3 1 2 3',
-    ],
-    [
-        '1         ',
-        ' 2        ',
-        '  3       ',
-        '   1      ',
-        '    2     ',
-        '     3    ',
-    ],
-    [
-        '111   111 ',
-        '222   222 ',
-        '333   333 ',
-    ],
-    [
-        '     222 ',
-        '   2    2',
-        '      22 ',
-        '   2    2',
-        '     222 ',
-    ],
-    [
-        '1 1 1 1 1 ',
-        ' 2 2 2 2 2',
-        '  3 3 3 3 ',
-        '   1 1 1  ',
-    ],
-    [
-        '    1     ',
-        '   222    ',
-        '  33333   ',
-        '   222    ',
-        '    1     ',
-    ],
-    [
-        ' 12321 ',
-        '1223221',
-        ' 12321 ',
-    ],
-    [
-        '111  3  111 ',
-        '222  3  222 ',
-        '111  3  111 ',
-    ],
-    [ 
-        '3 3 3 3 3 ',
-        '2 2 2 2 2 ',
-        '1 1 1 1 1 ',
-        '2 2 2 2 2 ',
-        '3 3 3 3 3 ',
-    ],
-    [
-        '1111111111',
-        '   2222   ',
-        '   3333   ',
-        '   2222   ',
-        '1111111111',
-    ],
-    [
-        '1111331111',
-        '  222222  ',
-        '   3333   ',          #GG bruh
-        '  222222  ',
-        '1111331111',
-    ],
-]
-
-# --- Extra (mystery ship) class ---
-class Extra(pygame.sprite.Sprite):
-    def __init__(self, side, screen_width):
+    def __init__(self, files):
         super().__init__()
-        self.image = IMAGES['mystery']
-        self.speed = -3 if side == 'right' else 3
-        x = screen_width + 50 if side == 'right' else -50
-        self.rect = self.image.get_rect(topleft=(x, 80))
-
-    def update(self):
-        self.rect.x += self.speed
-
-class Explosion(pygame.sprite.Sprite):
-    def __init__(self, x, y, enemy_type):
+        self.files = files
+        self.decoded = {}  # Superficies ya leídas por warm_up, sin convertir
+
+    def __missing__(self, key):
+        with _assets_lock:
+            if key in self:  # Otro hilo la cargó mientras esperábamos
+                return dict.__getitem__(self, key)
+            return self.load(key)
+
+    def load(self, key):
+        pack = asset_pack()
+        if pack is not None and key in pack:
+            img = self[key] = pack.image(key)
+            return img
+
+        name, _, size = key.partition('@')
+        raw = self.decoded.pop(name, None)
+        if raw is None:
+            raw = pygame.image.load(join(IMAGE_PATH, self.files[name]))
+        # convert_alpha necesita la pantalla, así que se hace en el hilo principal
+        img = raw.convert_alpha()
+        if size:
+            img = pygame.transform.scale(img, tuple(int(n) for n in size.split('x')))
+        self[key] = img
+        return img
+
+class SoundCache(dict):
+    def __init__(self, files):
         super().__init__()
-        self.enemy_type = enemy_type
-        self.images = {
-            '1': [IMAGES['explosionpurple']],
-            '2': [IMAGES['explosionblue']],
-            '3': [IMAGES['explosiongreen']],
-        }
-        self.image = self.images[enemy_type][0]
-        self.rect = self.image.get_rect(center=(x, y))
-        self.life_time = 500  # Duración de la explosión en milisegundos
-        self.spawn_time = pygame.time.get_ticks()
+        self.files = files
+
+    def __missing__(self, key):
+        with _assets_lock:
+            if key in self:
+                return dict.__getitem__(self, key)
+            pack = asset_pack()
+            if pack is not None:
+                sound = self[key] = pack.sound(key)
+            else:
+                sound = self[key] = pygame.mixer.Sound(join(AUDIO_PATH, self.files[key]))
+            return sound
+
+IMAGES = ImageCache(IMAGE_FILES)
+SOUNDS = SoundCache(SOUND_FILES)
+
+_warm_up_thread = None
+
+def _warm_up():
+    pack = asset_pack()
+    if pack is not None:
+        # Una lectura secuencial del paquete entero deja todo en la caché del SO
+        pack.map[:]
+    else:
+        for key, name in IMAGE_FILES.items():
+            with _assets_lock:
+                if key not in IMAGES and key not in IMAGES.decoded:
+                    IMAGES.decoded[key] = pygame.image.load(join(IMAGE_PATH, name))
+    if pygame.mixer.get_init():
+        for key in SOUND_FILES:
+            SOUNDS[key]
+    # El motor arrastra a NumPy; mejor pagar esa importación ahora
+    importlib.import_module('engine')
+
+def warm_up():
+    """Precarga imágenes, sonidos y el motor en un hilo mientras se ve el menú."""
+    global _warm_up_thread
+    if _warm_up_thread is None:
+        _warm_up_thread = threading.Thread(target=_warm_up, name='warm-up', daemon=True)
+        _warm_up_thread.start()
+    return _warm_up_thread
 
-    def update(self):
-        if pygame.time.get_ticks() - self.spawn_time > self.life_time:
-            self.kill()
 
-# --- Laser class ---
-class Laser(pygame.sprite.Sprite):
-    def __init__(self, pos, speed, screen_height, source='player'):
-        super().__init__()
-        self.image = IMAGES['laser'] if source == 'player' else IMAGES['enemylaser']
-        self.rect = self.image.get_rect(center=pos)
-        self.speed = speed
-        self.height_y_constraint = screen_height
+# --- Función para cargar el ranking ---
+# Las puntuaciones viven en SQLite (ver scores.py); los JSON antiguos se
+# importan la primera vez que se abre la base de datos.
+SINGLE_RANKING_FILE = os.path.join(os.path.dirname(__file__), 'single_ranking.json')
+MULTI_RANKING_FILE = os.path.join(os.path.dirname(__file__), 'multi_ranking.json')
+SCORES_FILE = os.path.join(os.path.dirname(__file__), 'scores.db')
 
-    def destroy(self):
-        if self.rect.y <= -50 or self.rect.y >= self.height_y_constraint + 50:
-            self.kill()
+SCORES = ScoreStore(SCORES_FILE, legacy={'single': SINGLE_RANKING_FILE, 'multi': MULTI_RANKING_FILE})
 
-    def update(self):
-        self.rect.y += self.speed
-        self.destroy()
+def single_load_ranking():
+    return SCORES.top('single', 5)  # Top 5
 
-# --- Block class ---
-class Block(pygame.sprite.Sprite):
-    def __init__(self, size, color, x, y):
-        super().__init__()
-        self.image = pygame.Surface((size, size))
-        self.image.fill(color)
-        self.rect = self.image.get_rect(topleft=(x, y))
+def single_save_score(name, score):
+    SCORES.add('single', name, score)
 
 
-def alien_shoot(aliens, enemy_lasers, screen_height, sound):
-    if aliens:
-        random_alien = choice(aliens.sprites())
-        laser = Laser(random_alien.rect.center, 6, screen_height, source='enemy')
-        enemy_lasers.add(laser)
-        sound.play()
+def multi_load_ranking():
+    return SCORES.top('multi', 5)  # Top 5
 
-# --- Create block pattern ---
-def create_block_pattern(x_offset, y_offset, size, color):
-    shape = [
-        '     x     ',
-        '    xxx    ',
-        '  xxxxxxx  ',
-        ' xxxxxxxxx ',
-        'xxxxxxxxxxx',
-        'xxxxxxxxxxx',
-        'xxxxxxxxxxx',
-        'xxx     xxx',
-        'xx       xx'
-    ]
-    
-    blocks = pygame.sprite.Group()
-    for row_idx, row in enumerate(shape):
-        for col_idx, char in enumerate(row):
-            if char == 'x':
-                x = x_offset + col_idx * size
-                y = y_offset + row_idx * size
-                blocks.add(Block(size, color, x, y))
-    return blocks
\ No newline at end of file
+def multi_save_score(name, score):
+    SCORES.add('multi', name, score)
+
+
+# --- Dibujo del estado de la simulación ---
+# Superficie de cada barrera; solo se vuelve a dibujar cuando cambia su versión
+SHIELD_SURFACES = WeakKeyDictionary()
+
+def shield_surface(shield):
+    cached = SHIELD_SURFACES.get(shield)
+    if cached and cached[0] == shield.version:
+        return cached[1]
+    surface = pygame.Surface((shield.w, shield.h), pygame.SRCALPHA)
+    s = shield.size
+    for row, col in zip(*shield.cells.nonzero()):
+        surface.fill(GREEN, (col * s, row * s, s, s))
+    SHIELD_SURFACES[shield] = (shield.version, surface)
+    return surface
+
+def play_events(events):
+    for name in events:
+        if name in SOUNDS:
+            SOUNDS[name].play()
+
+def lerp(entity, alpha):
+    return (entity.px + (entity.x - entity.px) * alpha, entity.py + (entity.y - entity.py) * alpha)
+
+def draw_world(surface, game, alpha=1.0):
+    """Dibuja el estado interpolando entre el tick anterior (alpha=0) y el actual (alpha=1)."""
+    from formation import ALIEN_TYPES  # Aquí para no cargar NumPy antes del primer frame del menú
+    for ship in game.ships:
+        if ship.alive:
+            surface.blit(IMAGES['ship'], lerp(ship, alpha))
+        else:
+            # La nave muerta se queda como una explosión verde
+            img = IMAGES['explosiongreen']
+            surface.blit(img, img.get_rect(center=ship.center))
+    for laser in game.lasers:
+        surface.blit(IMAGES['laser'], lerp(laser, alpha))
+    aliens = game.aliens
+    ox = (aliens.pdx - aliens.dx) * (1 - alpha)
+    oy = (aliens.pdy - aliens.dy) * (1 - alpha)
+    # Un sprite por tipo para toda la formación, según la fase de la animación
+    images = {kind: IMAGES[t.frames[aliens.phase]] for kind, t in ALIEN_TYPES.items()}
+    idx = aliens.indices()
+    for kind, x, y in zip(aliens.kind[idx].tolist(), (aliens.x[idx] + ox).tolist(), (aliens.y[idx] + oy).tolist()):
+        surface.blit(images[kind], (x, y))
+    for shield in game.shields:
+        surface.blit(shield_surface(shield), (shield.x, shield.y))
+    for extra in game.extras:
+        surface.blit(IMAGES['mystery'], lerp(extra, alpha))
+    for laser in game.enemy_lasers:
+        surface.blit(IMAGES['enemylaser'], lerp(laser, alpha))
+    for explosion in game.explosions:
+        surface.blit(IMAGES[ALIEN_TYPES[explosion.kind].explosion], (explosion.x, explosion.y))
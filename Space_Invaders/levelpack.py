@@ -0,0 +1,221 @@
+"""Paquetes de niveles compilados.
+
+Un paquete de niveles se escribe como texto (o JSON) y se compila a una
+tabla binaria de apariciones: por cada alien su tipo, su columna y fila en
+la rejilla y su posición en píxeles ya calculada. `Formation.from_spawns`
+crea la formación directamente desde esa tabla, sin volver a recorrer las
+cadenas de cada fila al empezar un nivel.
+
+Formato de texto: una fila por línea, '1', '2' y '3' son los tipos de alien
+y ' ' o '.' un hueco (las filas cortas se completan con huecos); una línea
+en blanco separa dos niveles y las que empiezan por '#' son comentarios.
+En JSON: {"levels": [["fila", ...], ...]}.
+
+Formato binario: b'SILV', versión (u32), número de niveles (u32), tabla
+de desplazamientos (u32, uno por nivel y uno más para el final) y las
+apariciones de todos los niveles como registros `SPAWN` de 8 bytes.
+
+Las fuentes se compilan una vez y el binario se guarda en CACHE_PATH con
+el hash del contenido como nombre, así que cambiar el fichero lo recompila
+y no cambiarlo no cuesta nada. El binario se abre con mmap y cada nivel se
+lee cuando se pide, de modo que un paquete con cientos de niveles no se
+procesa entero al arrancar.
+
+    python levelpack.py niveles.txt        # compila (o reutiliza la caché) y valida
+    python levelpack.py --builtin -o levels.silv
+
+`SPACE_INVADERS_LEVELS=ruta` cambia el paquete que usan las partidas nuevas.
+"""
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+from os.path import abspath, dirname, join
+
+import numpy as np
+
+BASE_PATH = abspath(dirname(__file__))
+CACHE_PATH = join(BASE_PATH, 'levels-cache')
+
+MAGIC = b'SILV'
+VERSION = 1
+HEADER = struct.Struct('<4sII')
+SPAWN = np.dtype([('kind', 'u1'), ('col', 'u1'), ('row', 'u1'), ('pad', 'u1'), ('x', '<i2'), ('y', '<i2')])
+
+ALIEN_CHARS = '123'
+GAP_CHARS = ' .'
+# Posición de la celda (0, 0) y separación de la rejilla, en píxeles
+ORIGIN_X, ORIGIN_Y = 100, 100
+STEP_X, STEP_Y = 50, 45
+# Lo que cabe entre el borde izquierdo y el derecho, y por encima de las barreras
+MAX_COLUMNS = 14
+MAX_ROWS = 7
+
+
+# --- Fuentes ---
+def parse_text(text):
+    levels, rows = [], []
+    for line in text.splitlines():
+        if line.startswith('#'):
+            continue
+        if line.strip():
+            rows.append(line.rstrip())
+        elif rows:
+            levels.append(rows)
+            rows = []
+    if rows:
+        levels.append(rows)
+    return levels
+
+
+def parse_json(text):
+    data = json.loads(text)
+    levels = data.get('levels') if isinstance(data, dict) else None
+    if not isinstance(levels, list):
+        raise ValueError('el JSON debe tener la forma {"levels": [["fila", ...], ...]}')
+    for i, rows in enumerate(levels, 1):
+        if not isinstance(rows, list) or not all(isinstance(row, str) for row in rows):
+            raise ValueError(f'nivel {i}: debe ser una lista de filas de texto')
+    return levels
+
+
+def validate(levels):
+    """Comprueba los niveles y devuelve sus filas completadas con huecos hasta el mismo ancho."""
+    if not levels:
+        raise ValueError('el paquete no tiene niveles')
+    normalized = []
+    for i, rows in enumerate(levels, 1):
+        if not rows or len(rows) > MAX_ROWS:
+            raise ValueError(f'nivel {i}: tiene {len(rows)} filas (de 1 a {MAX_ROWS})')
+        width = max(len(row) for row in rows)
+        if width > MAX_COLUMNS:
+            raise ValueError(f'nivel {i}: tiene {width} columnas (máximo {MAX_COLUMNS})')
+        for r, row in enumerate(rows, 1):
+            bad = set(row) - set(ALIEN_CHARS + GAP_CHARS)
+            if bad:
+                raise ValueError(f'nivel {i}, fila {r}: caracteres no válidos {"".join(sorted(bad))!r}')
+        if not any(char in ALIEN_CHARS for row in rows for char in row):
+            raise ValueError(f'nivel {i}: no tiene aliens')
+        normalized.append([row.ljust(width) for row in rows])
+    return normalized
+
+
+def spawn_table(rows):
+    """Apariciones de un nivel, fila a fila y de izquierda a derecha dentro de cada fila."""
+    spawns = [(int(char), col, row, 0, ORIGIN_X + col * STEP_X, ORIGIN_Y + row * STEP_Y)
+              for row, line in enumerate(rows) for col, char in enumerate(line) if char in ALIEN_CHARS]
+    return np.array(spawns, dtype=SPAWN)
+
+
+def compile_levels(levels):
+    """Compila una lista de niveles (listas de filas) al formato binario."""
+    tables = [spawn_table(rows) for rows in validate(levels)]
+    offsets = np.zeros(len(tables) + 1, dtype='<u4')
+    np.cumsum([len(table) for table in tables], out=offsets[1:])
+    return b''.join([HEADER.pack(MAGIC, VERSION, len(tables)), offsets.tobytes()]
+                    + [table.tobytes() for table in tables])
+
+
+def compile_source(path, cache_path=CACHE_PATH):
+    """Devuelve la ruta del binario compilado de `path`, compilándolo si no está en la caché."""
+    with open(path, 'rb') as f:
+        source = f.read()
+    key = hashlib.sha256(struct.pack('<I', VERSION) + source).hexdigest()[:20]
+    target = join(cache_path, f'{key}.silv')
+    if not os.path.exists(target):
+        text = source.decode('utf-8')
+        levels = parse_json(text) if path.endswith('.json') else parse_text(text)
+        data = compile_levels(levels)
+        os.makedirs(cache_path, exist_ok=True)
+        tmp = f'{target}.{os.getpid()}.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, target)
+    return target
+
+
+# --- Lectura ---
+class LevelPack:
+    """Niveles de un binario compilado; cada uno se lee la primera vez que se pide."""
+
+    def __init__(self, data, source=None):
+        self.data = data  # bytes o mmap
+        self.source = source  # Con qué volver a cargarlo (None para los niveles de serie)
+        magic, version, count = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'{source or "<memoria>"} no es un paquete de niveles v{VERSION}')
+        self.count = count
+        # Identifica el contenido (no la ruta): las grabaciones lo guardan para comprobarlo
+        self.digest = int.from_bytes(hashlib.sha256(data).digest()[:8], 'little')
+        self.offsets = np.frombuffer(data, dtype='<u4', count=count + 1, offset=HEADER.size)
+        self.spawns_start = HEADER.size + self.offsets.nbytes
+        self.levels = {}
+
+    @classmethod
+    def open(cls, path, source=None):
+        with open(path, 'rb') as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(data, source or path)
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        table = self.levels.get(index)
+        if table is None:
+            if not 0 <= index < self.count:
+                raise IndexError(index)
+            start, end = int(self.offsets[index]), int(self.offsets[index + 1])
+            table = self.levels[index] = np.frombuffer(self.data, dtype=SPAWN, count=end - start,
+                                                       offset=self.spawns_start + start * SPAWN.itemsize)
+        return table
+
+    def __reduce__(self):
+        # Las partidas guardan el paquete (instantáneas, rollback): se serializa solo su origen
+        return load, (self.source,)
+
+
+_packs = {}
+
+
+def load(source=None):
+    """El paquete de `source` (texto, JSON o binario .silv), o el de serie si es None."""
+    pack = _packs.get(source)
+    if pack is None:
+        if source is None:
+            from levels import LEVEL_PATTERNS
+            pack = LevelPack(compile_levels(LEVEL_PATTERNS))
+        elif source.endswith('.silv'):
+            pack = LevelPack.open(source)
+        else:
+            pack = LevelPack.open(compile_source(source), source)
+        _packs[source] = pack
+    return pack
+
+
+def get():
+    """El paquete de las partidas nuevas: el de SPACE_INVADERS_LEVELS o el de serie."""
+    return load(os.environ.get('SPACE_INVADERS_LEVELS') or None)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compila y valida paquetes de niveles')
+    parser.add_argument('source', nargs='?', help='fichero de texto o JSON')
+    parser.add_argument('--builtin', action='store_true', help='compila los niveles de levels.py')
+    parser.add_argument('-o', '--output', help='escribe aquí el binario en vez de usar la caché')
+    args = parser.parse_args()
+    if args.builtin:
+        from levels import LEVEL_PATTERNS
+        data = compile_levels(LEVEL_PATTERNS)
+    elif args.source:
+        data = open(compile_source(args.source), 'rb').read()
+    else:
+        parser.error('indica un fichero o --builtin')
+    if args.output:
+        with open(args.output, 'wb') as f:
+            f.write(data)
+    pack = LevelPack(data)
+    print(f'{len(pack)} niveles, {sum(len(pack[i]) for i in range(len(pack)))} aliens, {len(data)} bytes'
+          + (f' -> {args.output}' if args.output else ''))
@@ -0,0 +1,152 @@
+# --- Patrones de cada nivel ---
+# '1', '2' y '3' son los tipos de alien y ' ' o '.' un hueco; levelpack.validate rechaza el resto.
+LEVEL_PATTERNS = [
+    [
+        '  111111  ',
+        '  222222  ',
+        '3333333333',
+    ],
+    [
+        '  222222  ',
+        '  111111  ',
+        '3333333333',
+        '   2222   ',
+    ],
+    [
+        '1111111111',
+        '  222222  ',
+        '   3333   ',
+    ],
+    [
+        '   1111   ',
+        ' 22222222 ',
+        '  333333  ',
+        '   1111   ',
+    ],
+    [
+        '    1     ',
+        '   222    ',
+        '  33333   ',
+        ' 2222222  ',
+    ],
+    [
+        '1 1 1 1 1 ',
+        ' 2 2 2 2 2',
+        ' 33333333',
+    ],
+    [
+        '1111111111',
+        '2222222222',
+        '3333333333',
+    ],
+    [
+        '1 3 3 3 1 ',
+        '3 1 2 1 3',
+        '2 3 1 3 2',
+    ],
+    [
+        '1 1 1 1 1 ',
+        '2 2 2 2 2 ',
+        '3 3 3 3 3 ',
+        '1 2 3 2 1 ',
+    ],
+    [
+        '    111   ',
+        '  2222222 ',
+        ' 333333333',
+        '    111   ',
+    ],
+    [
+        '1 2 3 2 1 ',
+        '3 2 1 2 3 ',
+        '1 2 3 2 1 ',
+        '3 2 1 2 3 ',
+    ],
+    [
+        '1   1  333 ',
+        ' 1 1   3  3',
+        '  1    3  3',
+        ' 1 1   3  3',
+        '1   1  333 ',
+    ],
+    [
+        '1111111111',
+        '   2222   ',
+        '3333333333',
+        '   2222   ',
+    ],
+    [
+        '1 3 1 3 1 ',
+        '2 2 2 2 2 ',
+        '3 1 3 1 3 ',
+    ],
+    [
+        ' 1 2 3 1 2',
+        '3 1 2 3 1 ',
+        ' 2 3 1 2 3',
+    ],
+    [
+        '1         ',
+        ' 2        ',
+        '  3       ',
+        '   1      ',
+        '    2     ',
+        '     3    ',
+    ],
+    [
+        '111   111 ',
+        '222   222 ',
+        '333   333 ',
+    ],
+    [
+        '     222 ',
+        '   2    2',
+        '      22 ',
+        '   2    2',
+        '     222 ',
+    ],
+    [
+        '1 1 1 1 1 ',
+        ' 2 2 2 2 2',
+        '  3 3 3 3 ',
+        '   1 1 1  ',
+    ],
+    [
+        '    1     ',
+        '   222    ',
+        '  33333   ',
+        '   222    ',
+        '    1     ',
+    ],
+    [
+        ' 12321 ',
+        '1223221',
+        ' 12321 ',
+    ],
+    [
+        '111  3  111 ',
+        '222  3  222 ',
+        '111  3  111 ',
+    ],
+    [ 
+        '3 3 3 3 3 ',
+        '2 2 2 2 2 ',
+        '1 1 1 1 1 ',
+        '2 2 2 2 2 ',
+        '3 3 3 3 3 ',
+    ],
+    [
+        '1111111111',
+        '   2222   ',
+        '   3333   ',
+        '   2222   ',
+        '1111111111',
+    ],
+    [
+        '1111331111',
+        '  222222  ',
+        '   3333   ',          #GG bruh
+        '  222222  ',
+        '1111331111',
+    ],
+]
@@ -1,10 +1,12 @@
 import pygame
-from pygame import display, event, font, image, mouse
-import sys
+from pygame import mouse
 from os.path import abspath, dirname, join
-from random import randint, uniform
-import json
-from game_objects import single_load_ranking, multi_load_ranking
+import app
+from game_objects import single_load_ranking, multi_load_ranking, SCORES, IMAGES
+from assets import scaled_name
+from renderer import DirtyRenderer
+import scenes
+from scenes import Scene
 
 BASE_PATH = abspath(dirname(__file__))
 FONT_PATH = join(BASE_PATH, 'fonts/')
@@ -16,82 +18,104 @@ BLUE = (80, 255, 239)
 PURPLE = (203, 0, 255)
 RED = (237, 28, 36)
 
-pygame.init()
-pygame.font.init()
-
-SCREEN = display.set_mode((800, 600))
-display.set_caption("Space Invaders Menu")
-
-FONT = font.Font(FONT_PATH + 'space_invaders.ttf', 40)
-SMALL_FONT = font.Font(FONT_PATH + 'space_invaders.ttf', 24)
-TITLE_FONT = font.Font(FONT_PATH + 'space_invaders.ttf', 64)
-
-background_image = image.load(join(IMAGE_PATH, 'background.jpg')).convert()
-background_image = pygame.transform.scale(background_image, (800, 600))
-
-class Star:
-    def __init__(self):
-        self.reset()
-
-    def reset(self):
-        self.x = randint(0, 800)
-        self.y = randint(-600, 0)
-        self.speed = uniform(0.5, 2)
-        self.size = randint(1, 2)
-        self.color = (randint(180, 255), randint(180, 255), randint(180, 255))
-
-    def update(self):
-        self.y += self.speed
-        if self.y > 600:
-            self.reset()
-
-    def draw(self, surface):
-        pygame.draw.circle(surface, self.color, (int(self.x), int(self.y)), self.size)
-
-stars = [Star() for _ in range(100)]
-
+# La pantalla, las fuentes y las imágenes del menú se crean en setup(),
+# no al importar el módulo
+SCREEN = None
+FONT = SMALL_FONT = TITLE_FONT = RANKING_FONT = None
+RENDERER = None
+# Fondo, título, leyenda y botones sin resaltar compuestos una sola vez;
+# los rankings se añaden encima cada vez que cambian (ver compose_menu)
+STATIC_LAYER = None
+MENU_BUTTONS = []
+
+def setup():
+    global SCREEN, FONT, SMALL_FONT, TITLE_FONT, RANKING_FONT, RENDERER, STATIC_LAYER
+    SCREEN = app.bootstrap("Space Invaders Menu")
+    if RENDERER is not None:
+        return
+    FONT = app.font(40)
+    SMALL_FONT = app.font(24)
+    TITLE_FONT = app.font(64)
+    RANKING_FONT = app.font(18)
+
+    background_image = IMAGES[scaled_name('background', (800, 600))].convert()
+
+    for key, data in enemy_images.items():
+        data["img"] = load_enemy_image(key, data["size"])
+
+    STATIC_LAYER = background_image.copy()
+    title_pos = (SCREEN.get_width() // 2 - 300, 50)
+    render_glow_text(STATIC_LAYER, "Space Invaders", title_pos, TITLE_FONT, WHITE, (100, 100, 255))
+    for data in enemy_images.values():
+        STATIC_LAYER.blit(data["img"], data["pos"])
+        STATIC_LAYER.blit(SMALL_FONT.render(data["points"], True, data["color"]), data["text_pos"])
+    MENU_BUTTONS[:] = [MenuButton(STATIC_LAYER, *args) for args in (
+        ("Single Player", (50, 200), GREEN, BLUE, start_single_player),
+        ("Multiplayer", (450, 200), GREEN, BLUE, start_multiplayer),
+        ("Exit", (650, 500), RED, PURPLE, exit_game))]
+
+    # Solo se redibuja y se envía a la pantalla lo que cambió de un frame a otro;
+    # lo que se borra se repone desde la capa estática
+    RENDERER = DirtyRenderer(SCREEN, STATIC_LAYER)
+
+# El campo de estrellas (ver starfield.py) se crea tras el primer frame:
+# importar NumPy antes retrasaría la aparición del menú
+STAR_COUNT = 100
+starfield = None
+
+# Las acciones de los botones devuelven la escena a la que se pasa
 def start_single_player():
     import single_player
-    single_player.run_game()  # Esta función debe terminar limpiamente y regresar aquí
+    return single_player.new_game()
 
 def start_multiplayer():
     import multiplayer
-    multiplayer.run_game()  # Esta función debe terminar limpiamente y regresar aquí
+    return multiplayer.new_game()
 
 def exit_game():
-    pygame.quit()
-    sys.exit()
-
-def render_glow_text(text, pos, font_obj, base_color, glow_color):
-    for offset in range(1, 5):
-        glow_surface = font_obj.render(text, True, glow_color)
-        SCREEN.blit(glow_surface, (pos[0] - offset, pos[1] - offset))
-        SCREEN.blit(glow_surface, (pos[0] + offset, pos[1] + offset))
-        SCREEN.blit(glow_surface, (pos[0] - offset, pos[1] + offset))
-        SCREEN.blit(glow_surface, (pos[0] + offset, pos[1] - offset))
-    text_surface = font_obj.render(text, True, base_color)
-    SCREEN.blit(text_surface, pos)
-
-def draw_text_button(text, pos, default_color, hover_color, action=None):
-    mouse_pos = mouse.get_pos()
-    mouse_click = mouse.get_pressed()
-
-    is_hovered = False
-    text_surface = FONT.render(text, True, default_color)
-    rect = text_surface.get_rect(topleft=pos)
-
-    if rect.collidepoint(mouse_pos):
-        is_hovered = True
-        if mouse_click[0] and action:
-            action()
-
-    inner_color = hover_color if is_hovered else default_color
-    glow_color = (40, 40, 40)
-    render_glow_text(text, pos, FONT, inner_color, glow_color)
+    return scenes.QUIT
+
+GLOW_SIZE = 4
+
+def render_glow_text(surface, text, pos, font_obj, base_color, glow_color):
+    glow_surface = font_obj.render(text, True, glow_color)
+    for offset in range(1, GLOW_SIZE + 1):
+        surface.blit(glow_surface, (pos[0] - offset, pos[1] - offset))
+        surface.blit(glow_surface, (pos[0] + offset, pos[1] + offset))
+        surface.blit(glow_surface, (pos[0] - offset, pos[1] + offset))
+        surface.blit(glow_surface, (pos[0] + offset, pos[1] - offset))
+    surface.blit(font_obj.render(text, True, base_color), pos)
+
+class MenuButton:
+    """Botón con sus dos versiones (normal y resaltada) ya compuestas sobre el fondo.
+
+    La normal se pinta en `layer`; al pasar el ratón solo se copia encima la
+    resaltada.
+    """
+
+    def __init__(self, layer, text, pos, default_color, hover_color, action):
+        self.action = action
+        self.rect = FONT.render(text, True, default_color).get_rect(topleft=pos)
+        self.area = self.rect.inflate(2 * GLOW_SIZE, 2 * GLOW_SIZE)
+        self.normal = self.compose(layer, text, default_color)
+        self.hover = self.compose(layer, text, hover_color)
+        layer.blit(self.normal, self.area)
+
+    def compose(self, layer, text, color):
+        surface = layer.subsurface(self.area).copy()
+        render_glow_text(surface, text, (GLOW_SIZE, GLOW_SIZE), FONT, color, (40, 40, 40))
+        return surface
+
+    def draw(self, mouse_pos, pressed):
+        """Dibuja el resaltado si hace falta y devuelve el resultado de `action` si se está pulsando."""
+        if not self.rect.collidepoint(mouse_pos):
+            return None
+        RENDERER.blit(self.hover, self.area)
+        return self.action() if pressed else None
 
 def load_enemy_image(filename, size):
-    img = image.load(join(IMAGE_PATH, filename)).convert_alpha()
-    return pygame.transform.scale(img, size)
+    # Sale ya reescalada del paquete de assets si está construido
+    return IMAGES[scaled_name(filename[:-len('.png')], size)]
 
 enemy_images = {
     "enemy1_1.png": {
@@ -125,55 +149,96 @@ enemy_images = {
 }
 
 
-for key, data in enemy_images.items():
-    data["img"] = load_enemy_image(key, data["size"])
-
-def main():
-    running = True
-    while running:
-        SCREEN.blit(background_image, (0, 0))
-
-        for star in stars:
-            star.update()
-            star.draw(SCREEN)
-
-        title_pos = (SCREEN.get_width() // 2 - 300, 50)
-        render_glow_text("Space Invaders", title_pos, TITLE_FONT, WHITE, (100, 100, 255))
-
-        draw_text_button("Single Player", (50, 200), GREEN, BLUE, start_single_player)
-        draw_text_button("Multiplayer", (450, 200), GREEN, BLUE, start_multiplayer)
-        draw_text_button("Exit", (650, 500), RED, PURPLE, exit_game)
-
-        for data in enemy_images.values():
-            SCREEN.blit(data["img"], data["pos"])
-            text_surface = SMALL_FONT.render(data["points"], True, data["color"])
-            SCREEN.blit(text_surface, data["text_pos"])
-
-        for e in event.get():
-            if e.type == pygame.QUIT:
-                running = False
-
-        single_ranking = single_load_ranking()
-        start_y = 260
-        colors = [(255, 215, 0), (192, 192, 192), (205, 127, 50)]  # Oro, plata, bronce
-        for i, player in enumerate(single_ranking):
+RANKING_COLORS = [(255, 215, 0), (192, 192, 192), (205, 127, 50)]  # Oro, plata, bronce
+
+class RankingView:
+    """Filas del ranking ya renderizadas y guardadas en memoria.
+
+    Solo se vuelve a consultar la base de datos si alguien guardó en este
+    proceso (al momento) o en otro (se comprueba como mucho una vez cada
+    `check_interval` milisegundos).
+    """
+
+    def __init__(self, load, pos, check_interval=1000):
+        self.load = load
+        self.pos = pos
+        self.check_interval = check_interval
+        self.rows = []
+        self.version = None
+        self.saves = None
+        self.last_check = None
+
+    def refresh(self):
+        """Vuelve a renderizar las filas si cambió el ranking; devuelve True en ese caso."""
+        now = pygame.time.get_ticks()
+        if SCORES.saves == self.saves and self.last_check is not None and now - self.last_check < self.check_interval:
+            return False
+        self.last_check = now
+        version = SCORES.version()
+        if version == self.version:
+            return False
+        self.version = version
+        self.saves = SCORES.saves
+        self.rows = []
+        x, start_y = self.pos
+        for i, player in enumerate(self.load()):
             text = f"{i+1}. {player['name']} - {player['score']} pts"
-            color = colors[i] if i < 3 else WHITE
-            text_surface = font.Font(FONT_PATH + 'space_invaders.ttf', 18).render(text, True, color)
-            SCREEN.blit(text_surface, (60, start_y + i * 25))
-
-                # Ranking multijugador
-        multi_ranking = multi_load_ranking()
-        start_y_multi = 260
-        for i, player in enumerate(multi_ranking):
-            text = f"{i+1}. {player['name']} - {player['score']} pts"
-            color = colors[i] if i < 3 else WHITE
-            text_surface = font.Font(FONT_PATH + 'space_invaders.ttf', 18).render(text, True, color)
-            SCREEN.blit(text_surface, (460, start_y_multi + i * 25))
-
+            color = RANKING_COLORS[i] if i < 3 else WHITE
+            self.rows.append((RANKING_FONT.render(text, True, color), (x, start_y + i * 25)))
+        return True
 
-        display.update()
+    def draw(self, surface):
+        for text_surface, pos in self.rows:
+            surface.blit(text_surface, pos)
+
+single_ranking_view = RankingView(single_load_ranking, (60, 260))
+multi_ranking_view = RankingView(multi_load_ranking, (460, 260))
+
+def compose_menu():
+    """Capa de fondo del menú: la estática más los rankings, si alguno cambió."""
+    changed = single_ranking_view.refresh()
+    changed = multi_ranking_view.refresh() or changed
+    if changed:
+        layer = STATIC_LAYER.copy()
+        single_ranking_view.draw(layer)
+        multi_ranking_view.draw(layer)
+        RENDERER.set_background(layer)
+        # El borrado de este frame ya se hizo con la capa anterior
+        RENDERER.surface.blit(layer, (0, 0))
+
+class MenuScene(Scene):
+    name = 'menu'
+    caption = "Space Invaders Menu"
+
+    def enter(self):
+        setup()
+        self.renderer = RENDERER
+        RENDERER.invalidate()
+
+    def update(self, elapsed):
+        global starfield
+        if starfield is None:
+            if app.first_frame_ms is None:
+                return
+            from starfield import Starfield
+            starfield = Starfield(STAR_COUNT, SCREEN.get_size())
+        starfield.update(elapsed)
+
+    def draw(self):
+        # El resto de lo que se ve está en la capa de fondo del renderer
+        compose_menu()
+        if starfield is not None:
+            starfield.draw(RENDERER)
+
+        mouse_pos = mouse.get_pos()
+        pressed = mouse.get_pressed()[0]
+        for button in MENU_BUTTONS:
+            next_scene = button.draw(mouse_pos, pressed)
+            if next_scene is not None:
+                self.switch(next_scene)
 
+def main():
+    scenes.run(MenuScene())
     pygame.quit()
 
 # Solo se ejecuta si este archivo se ejecuta directamente
@@ -0,0 +1,187 @@
+"""Instrumentación por fases del bucle principal.
+
+Los bucles de juego y del menú marcan el final de cada fase con
+`metrics.stage(nombre)`; el tiempo desde la marca anterior va a un
+histograma por escena y fase. Además se cuentan los sprites de cada grupo,
+las pruebas de colisión y los blits de cada frame.
+
+Se activa con variables de entorno:
+
+    SPACE_INVADERS_METRICS=metrics.prom   # exporta cada 5 s en formato de texto de Prometheus
+    SPACE_INVADERS_OVERLAY=1              # muestra los tiempos en pantalla (F3 lo alterna)
+
+Desactivado, `get()` devuelve un `NullMetrics` cuyos métodos no hacen nada,
+así que el coste es una llamada vacía por fase.
+"""
+import os
+import time
+from bisect import bisect_left
+
+import pygame
+
+# Límites superiores de los cubos de los histogramas, en segundos
+BUCKETS = (0.0005, 0.001, 0.002, 0.004, 0.008, 0.0166, 0.033, 0.066, float('inf'))
+EXPORT_INTERVAL = 5.0
+PREFIX = 'space_invaders'
+OVERLAY_KEY = pygame.K_F3
+
+
+class NullMetrics:
+    enabled = False
+
+    def begin(self, scene):
+        pass
+
+    def stage(self, name):
+        pass
+
+    def count(self, name, value=1):
+        pass
+
+    def sample_game(self, game):
+        pass
+
+    def handle_event(self, e):
+        pass
+
+    def draw_overlay(self, renderer):
+        pass
+
+    def end(self, renderer=None):
+        pass
+
+
+class Metrics:
+    enabled = True
+
+    def __init__(self, export_path=None, overlay=False, interval=EXPORT_INTERVAL):
+        self.export_path = export_path
+        self.overlay = overlay
+        self.interval = interval
+        self.scene = None
+        self.last = 0.0
+        self.frame = {}  # Tiempos de la fase en el frame actual, para el overlay
+        self.shown = {}  # Los del último frame completo
+        self.histograms = {}  # (escena, fase) -> [cubos, suma, cuenta]
+        self.counters = {}  # (escena, nombre) -> total
+        self.gauges = {}  # (escena, grupo) -> sprites en el último frame
+        self.frames = {}  # escena -> frames
+        self.next_export = time.perf_counter() + interval
+
+    # --- Marcas del bucle ---
+    def begin(self, scene):
+        self.scene = scene
+        self.frame = {}
+        self.last = time.perf_counter()
+
+    def stage(self, name):
+        now = time.perf_counter()
+        elapsed = now - self.last
+        self.last = now
+        self.frame[name] = self.frame.get(name, 0.0) + elapsed
+        key = (self.scene, name)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = [[0] * len(BUCKETS), 0.0, 0]
+        histogram[0][bisect_left(BUCKETS, elapsed)] += 1
+        histogram[1] += elapsed
+        histogram[2] += 1
+
+    def count(self, name, value=1):
+        key = (self.scene, name)
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def sample_game(self, game):
+        """Apunta los sprites de cada grupo y las pruebas de colisión del frame."""
+        scene = self.scene
+        gauges = self.gauges
+        gauges[(scene, 'aliens')] = len(game.aliens)
+        gauges[(scene, 'ships')] = sum(ship.alive for ship in game.ships)
+        gauges[(scene, 'lasers')] = len(game.lasers)
+        gauges[(scene, 'enemy_lasers')] = len(game.enemy_lasers)
+        gauges[(scene, 'extras')] = len(game.extras)
+        gauges[(scene, 'explosions')] = len(game.explosions)
+        gauges[(scene, 'shields')] = len(game.shields)
+        self.count('collision_tests', game.collision_tests)
+        game.collision_tests = 0
+
+    def handle_event(self, e):
+        if e.type == pygame.KEYDOWN and e.key == OVERLAY_KEY:
+            self.overlay = not self.overlay
+
+    def draw_overlay(self, renderer):
+        if not self.overlay:
+            return
+        import app
+        font = app.hud_font(16)
+        scene = self.scene
+        stages = '  '.join(f'{name} {seconds * 1000:.2f}' for name, seconds in self.shown.items())
+        sprites = sum(value for (s, _), value in self.gauges.items() if s == scene)
+        lines = [
+            f'{stages} ms',
+            f'sprites {sprites}  blits {getattr(renderer, "blits", 0)}',
+        ]
+        y = renderer.get_height() - len(lines) * font.height - 4
+        for line in lines:
+            renderer.blit(font.render(line, (255, 255, 0)), (4, y))
+            y += font.height
+
+    def end(self, renderer=None):
+        scene = self.scene
+        self.frames[scene] = self.frames.get(scene, 0) + 1
+        if renderer is not None:
+            self.count('blits', renderer.blits)
+        self.shown = self.frame
+        if self.export_path and self.last >= self.next_export:
+            self.next_export = self.last + self.interval
+            self.export()
+
+    # --- Exportación ---
+    def to_text(self):
+        lines = [
+            f'# HELP {PREFIX}_stage_seconds Tiempo de cada fase del frame.',
+            f'# TYPE {PREFIX}_stage_seconds histogram',
+        ]
+        for (scene, stage), (buckets, total, count) in sorted(self.histograms.items()):
+            labels = f'scene="{scene}",stage="{stage}"'
+            cumulative = 0
+            for bound, n in zip(BUCKETS, buckets):
+                cumulative += n
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{PREFIX}_stage_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f'{PREFIX}_stage_seconds_sum{{{labels}}} {total!r}')
+            lines.append(f'{PREFIX}_stage_seconds_count{{{labels}}} {count}')
+
+        lines.append(f'# TYPE {PREFIX}_frames_total counter')
+        for scene, count in sorted(self.frames.items()):
+            lines.append(f'{PREFIX}_frames_total{{scene="{scene}"}} {count}')
+        for name in sorted({name for _, name in self.counters}):
+            lines.append(f'# TYPE {PREFIX}_{name}_total counter')
+            for (scene, counter), value in sorted(self.counters.items()):
+                if counter == name:
+                    lines.append(f'{PREFIX}_{name}_total{{scene="{scene}"}} {value}')
+        lines.append(f'# TYPE {PREFIX}_sprites gauge')
+        for (scene, group), value in sorted(self.gauges.items()):
+            lines.append(f'{PREFIX}_sprites{{scene="{scene}",group="{group}"}} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def export(self, path=None):
+        # Se escribe aparte y se sustituye, para que quien lo lea nunca vea un fichero a medias
+        path = path or self.export_path
+        tmp = path + '.tmp'
+        with open(tmp, 'w') as f:
+            f.write(self.to_text())
+        os.replace(tmp, path)
+
+
+_metrics = None
+
+
+def get():
+    """Las métricas de la aplicación, configuradas desde el entorno la primera vez."""
+    global _metrics
+    if _metrics is None:
+        export_path = os.environ.get('SPACE_INVADERS_METRICS')
+        overlay = bool(os.environ.get('SPACE_INVADERS_OVERLAY'))
+        _metrics = Metrics(export_path, overlay) if export_path or overlay else NullMetrics()
+    return _metrics
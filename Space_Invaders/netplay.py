@@ -0,0 +1,413 @@
+"""Multijugador en red con rollback sobre UDP.
+
+Cada jugador simula la partida completa en su máquina y solo se envían las
+entradas. La entrada local se aplica con `input_delay` ticks de retraso;
+la del otro jugador, si todavía no ha llegado, se predice repitiendo la
+última recibida. Cuando llega una entrada que no coincide con la predicha,
+se vuelve a la instantánea de ese tick (`Game.snapshot`) y se resimula
+hasta el tick actual. Así el juego sigue a 60 Hz aunque la latencia sea de
+100 ms o más: solo se corrige lo poco que cambió.
+
+Cada paquete repite todas las entradas locales que el otro aún no ha
+confirmado, de modo que un paquete perdido se recupera con el siguiente.
+También lleva el checksum del último tick definitivo para detectar una
+desincronización.
+
+    python netplay.py --delay 0.1 --loss 0.1   # prueba en local con latencia y pérdidas
+"""
+import argparse
+import random
+import socket
+import struct
+import time
+
+from engine import Game
+
+MAGIC = b'SINT'
+HELLO = 1
+INPUTS = 2
+# magic, tipo, jugador, listo, semilla, y después el nombre en UTF-8
+HELLO_HEADER = struct.Struct('<4sBBBQ')
+# magic, tipo, tick del emisor, ticks del otro ya recibidos, primer tick enviado,
+# tick del checksum, checksum, ventaja en ticks, número de entradas
+INPUTS_HEADER = struct.Struct('<4sBIIIIIbB')
+MAX_INPUTS = 255
+CHECKSUM_HISTORY = 240
+SYNC_INTERVAL = 30  # Ticks mínimos entre dos esperas para igualar el ritmo
+SMOOTHING = 0.1  # Peso de cada muestra en la media de la ventaja
+# Cabecera de cada tipo de mensaje; los paquetes más cortos se descartan
+MESSAGES = {HELLO: HELLO_HEADER, INPUTS: INPUTS_HEADER}
+
+
+def message_kind(data):
+    """Tipo del paquete (HELLO o INPUTS) si es de este protocolo y está completo, o None."""
+    if len(data) <= len(MAGIC) or data[:4] != MAGIC:
+        return None
+    kind = data[4]
+    header = MESSAGES.get(kind)
+    if header is None or len(data) < header.size:
+        return None
+    if kind == INPUTS and len(data) < header.size + data[header.size - 1]:
+        return None  # Faltan entradas de las que anuncia la cabecera
+    return kind
+
+
+# --- Transporte ---
+class UdpTransport:
+    """Socket UDP no bloqueante. Sin `peer` aprende la dirección del primer saludo válido."""
+
+    def __init__(self, bind=('0.0.0.0', 0), peer=None):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(bind)
+        self.sock.setblocking(False)
+        # Se resuelve el nombre para poder comparar con la dirección de los paquetes
+        self.peer = (socket.gethostbyname(peer[0]), peer[1]) if peer else None
+
+    @property
+    def address(self):
+        return self.sock.getsockname()
+
+    def send(self, data):
+        if self.peer is not None:
+            self.sock.sendto(data, self.peer)
+
+    def receive(self):
+        packets = []
+        while True:
+            try:
+                data, addr = self.sock.recvfrom(2048)
+            except (BlockingIOError, ConnectionResetError):
+                return packets
+            if self.peer is None and message_kind(data) == HELLO:
+                self.peer = addr
+            if addr == self.peer:
+                packets.append(data)
+
+    def close(self):
+        self.sock.close()
+
+
+class LossyTransport:
+    """Envuelve un transporte y retrasa, desordena o pierde paquetes al enviarlos."""
+
+    def __init__(self, inner, delay=0.0, jitter=0.0, loss=0.0, seed=None, clock=time.monotonic):
+        self.inner = inner
+        self.delay = delay
+        self.jitter = jitter
+        self.loss = loss
+        self.rng = random.Random(seed)
+        self.clock = clock
+        self.queue = []  # [(momento de salida, datos)]
+
+    def send(self, data):
+        if self.rng.random() >= self.loss:
+            self.queue.append((self.clock() + self.delay + self.rng.uniform(0, self.jitter), data))
+        self.flush()
+
+    def flush(self):
+        now = self.clock()
+        due = [item for item in self.queue if item[0] <= now]
+        if due:
+            self.queue = [item for item in self.queue if item[0] > now]
+            for _, data in sorted(due, key=lambda item: item[0]):
+                self.inner.send(data)
+
+    def receive(self):
+        self.flush()
+        return self.inner.receive()
+
+    def close(self):
+        self.inner.close()
+
+
+# --- Conexión ---
+class Handshake:
+    """Intercambia semilla y nombres. El jugador 0 elige la semilla.
+
+    `poll()` no bloquea: devuelve None hasta que los dos extremos se han oído.
+    """
+
+    def __init__(self, transport, local, name, seed=None, interval=0.1, clock=time.monotonic):
+        self.transport = transport
+        self.local = local
+        self.name = name
+        self.seed = (seed if seed is not None else random.randrange(2 ** 32)) if local == 0 else 0
+        self.interval = interval
+        self.clock = clock
+        self.remote_name = None
+        self.heard_back = False  # El otro ya ha recibido nuestro saludo
+        self.next_send = 0.0
+
+    def poll(self):
+        for data in self.transport.receive():
+            kind = message_kind(data)
+            if kind == HELLO:
+                _, _, player, ready, seed = HELLO_HEADER.unpack_from(data)
+                if player == self.local:
+                    continue
+                self.remote_name = data[HELLO_HEADER.size:].decode('utf-8', 'replace')
+                self.heard_back = self.heard_back or bool(ready)
+                if self.local == 1:
+                    self.seed = seed
+            elif kind == INPUTS and self.remote_name is not None:
+                self.heard_back = True  # El otro ya está jugando
+        now = self.clock()
+        if now >= self.next_send:
+            self.next_send = now + self.interval
+            ready = self.remote_name is not None
+            self.transport.send(HELLO_HEADER.pack(MAGIC, HELLO, self.local, ready, self.seed)
+                                + self.name.encode('utf-8'))
+        if self.remote_name is not None and self.heard_back:
+            return self.seed, self.remote_name
+        return None
+
+
+# --- Sesión con rollback ---
+class NetSession:
+    def __init__(self, game, local, transport, input_delay=2, max_prediction=15):
+        self.game = game
+        self.local = local
+        self.remote = 1 - local
+        self.transport = transport
+        self.input_delay = input_delay
+        self.max_prediction = max_prediction  # Ticks como mucho por delante de lo confirmado
+        self.frame = 0  # Ticks simulados
+        # Entradas por jugador (tick -> bits); los primeros ticks van vacíos por el retraso
+        self.inputs = [{t: 0 for t in range(input_delay)} for _ in range(2)]
+        self.confirmed = input_delay  # Hay entradas remotas de todos los ticks anteriores
+        self.remote_ack = 0  # Entradas locales que el otro ya tiene
+        self.remote_frame = 0
+        # Ventaja media (en ticks) de cada extremo sobre el otro, según lo que ve cada uno
+        self.local_advantage = 0.0
+        self.remote_advantage = 0.0
+        self.sync_after = 0
+        self.used = {}  # tick -> entrada remota usada al simular (real o predicha)
+        self.snapshots = {}  # tick -> estado antes de simular ese tick
+        self.checksums = {}  # tick -> checksum después de simularlo
+        self.remote_checksums = {}
+        self.rollback_to = None
+        self.rollbacks = 0
+        self.rollback_ticks = 0
+        self.stalls = 0
+        self.desync = None  # Primer tick en el que los checksums no coinciden
+        self.over_at = None  # Ticks simulados cuando la partida terminó (según lo que sabemos)
+
+    # --- Red ---
+    def poll(self):
+        for data in self.transport.receive():
+            if message_kind(data) == INPUTS:
+                self.receive(data)
+        if self.rollback_to is not None:
+            self.rollback(self.rollback_to)
+            self.rollback_to = None
+        self.compare_checksums()
+
+    def receive(self, data):
+        _, _, frame, ack, first, crc_tick, crc, advantage, count = INPUTS_HEADER.unpack_from(data)
+        self.remote_frame = max(self.remote_frame, frame)
+        self.remote_advantage += SMOOTHING * (advantage - self.remote_advantage)
+        self.remote_ack = max(self.remote_ack, ack)
+        if crc_tick or crc:
+            self.remote_checksums[crc_tick] = crc
+        remote_inputs = self.inputs[self.remote]
+        for offset, bits in enumerate(data[INPUTS_HEADER.size:INPUTS_HEADER.size + count]):
+            tick = first + offset
+            if tick in remote_inputs:
+                continue
+            remote_inputs[tick] = bits
+            used = self.used.get(tick)
+            if used is not None and used != bits:
+                # Se simuló con una predicción equivocada: hay que volver a ese tick
+                self.rollback_to = tick if self.rollback_to is None else min(self.rollback_to, tick)
+        while self.confirmed in remote_inputs:
+            self.confirmed += 1
+
+    def send(self):
+        local_inputs = self.inputs[self.local]
+        first = self.remote_ack
+        last = min(self.frame + self.input_delay, first + MAX_INPUTS)
+        payload = bytes(local_inputs[t] for t in range(first, last))
+        crc_tick = min(self.confirmed, self.frame) - 1
+        crc = self.checksums.get(crc_tick, 0)
+        advantage = max(-128, min(127, self.frame - self.remote_frame))
+        self.transport.send(INPUTS_HEADER.pack(MAGIC, INPUTS, self.frame, self.confirmed, first,
+                                               max(crc_tick, 0), crc, advantage, len(payload)) + payload)
+
+    def compare_checksums(self):
+        final = min(self.confirmed, self.frame)
+        for tick in [t for t in self.remote_checksums if t < final]:
+            crc = self.remote_checksums.pop(tick)
+            mine = self.checksums.get(tick)
+            if mine is not None and mine != crc and self.desync is None:
+                self.desync = tick
+
+    # --- Simulación ---
+    def predicted(self, tick):
+        """Entrada remota para `tick`: la real si ha llegado, si no la última conocida."""
+        bits = self.inputs[self.remote].get(tick)
+        return self.inputs[self.remote].get(self.confirmed - 1, 0) if bits is None else bits
+
+    def simulate(self, tick):
+        self.snapshots[tick] = self.game.snapshot()
+        inputs = [0, 0]
+        inputs[self.local] = self.inputs[self.local][tick]
+        inputs[self.remote] = self.used[tick] = self.predicted(tick)
+        events = self.game.step(inputs)
+        self.checksums[tick] = self.game.checksum()
+        if self.game.over and self.over_at is None:
+            self.over_at = tick + 1
+        return events
+
+    def rollback(self, tick):
+        self.rollbacks += 1
+        self.rollback_ticks += self.frame - tick
+        self.game = Game.restore(self.snapshots[tick])
+        if self.over_at is not None and self.over_at > tick:
+            self.over_at = None  # El final se vuelve a decidir con las entradas corregidas
+        for t in range(tick, self.frame):
+            self.simulate(t)  # Los eventos ya sonaron la primera vez
+
+    def prune(self):
+        # Nunca se vuelve a un tick anterior al primero sin confirmar
+        keep = min(self.confirmed, self.frame)
+        for t in [t for t in self.snapshots if t < keep]:
+            del self.snapshots[t]
+            self.used.pop(t, None)
+        for t in [t for t in self.checksums if t < keep - CHECKSUM_HISTORY]:
+            del self.checksums[t]
+
+    def should_wait(self):
+        """True si vamos claramente por delante del otro y conviene saltarse un tick."""
+        if self.frame < self.sync_after:
+            return False
+        if (self.local_advantage - self.remote_advantage) / 2 >= 1:
+            self.sync_after = self.frame + SYNC_INTERVAL
+            return True
+        return False
+
+    def advance(self, local_bits):
+        """Avanza un tick con la entrada local. Devuelve los eventos del tick (o [] si espera)."""
+        self.poll()
+        self.local_advantage += SMOOTHING * (self.frame - self.remote_frame - self.local_advantage)
+        if self.frame >= self.confirmed + self.max_prediction:
+            # Demasiado por delante de lo que sabemos del otro: esperar a sus entradas
+            self.stalls += 1
+            self.send()
+            return []
+        self.inputs[self.local].setdefault(self.frame + self.input_delay, local_bits)
+        events = self.simulate(self.frame)
+        self.frame += 1
+        self.prune()
+        self.send()
+        return events
+
+    def finished(self):
+        """True si la partida terminó en un tick que ya no puede cambiar y el otro tiene nuestras entradas.
+
+        Después del final `frame` sigue avanzando (las entradas se siguen
+        enviando), así que se compara con el tick del final y no con `frame`.
+        """
+        over_at = self.over_at
+        return over_at is not None and self.confirmed >= over_at and self.remote_ack >= over_at
+
+    def close(self):
+        self.transport.close()
+
+
+# --- Prueba en local ---
+def scripted_inputs(seed):
+    """Entrada que cambia de vez en cuando, como la de una persona."""
+    rng = random.Random(seed)
+    choices = (0, 1, 2, 4, 5, 6)
+    bits = 0
+    while True:
+        if rng.random() < 0.08:
+            bits = rng.choice(choices)
+        yield bits
+
+
+def selftest(ticks=3600, delay=0.1, jitter=0.02, loss=0.1, seed=1, tick_rate=60, until_over=False):
+    """Dos sesiones por UDP en 127.0.0.1 con un reloj simulado.
+
+    Comprueba que las dos acaban en el mismo estado y que ese estado es el
+    mismo que da una simulación local con las entradas definitivas. Con
+    `until_over` se juega hasta que las dos sesiones dan la partida por
+    terminada (`finished`), con `ticks` como límite.
+    """
+    now = [0.0]
+    clock = lambda: now[0]
+    udp = [UdpTransport(('127.0.0.1', 0)) for _ in range(2)]
+    udp[0].peer, udp[1].peer = udp[1].address, udp[0].address
+    transports = [LossyTransport(u, delay, jitter, loss, seed=seed + i, clock=clock) for i, u in enumerate(udp)]
+
+    handshakes = [Handshake(t, i, f'P{i + 1}', seed=seed, clock=clock) for i, t in enumerate(transports)]
+    results = [None, None]
+    while None in results:
+        now[0] += 1 / tick_rate
+        results = [h.poll() for h in handshakes]
+    game_seed = results[0][0]
+    sessions = [NetSession(Game('multi', seed=game_seed), i, t) for i, t in enumerate(transports)]
+    scripts = [scripted_inputs(seed * 10 + i) for i in range(2)]
+
+    frame_times = []
+    waits = 0
+    def running():
+        if until_over:
+            return not all(s.finished() for s in sessions) and max(s.frame for s in sessions) < ticks
+        return min(s.frame for s in sessions) < ticks
+
+    while running():
+        now[0] += 1 / tick_rate
+        for session, script in zip(sessions, scripts):
+            start = time.perf_counter()
+            if session.should_wait():
+                waits += 1
+                session.poll()
+                session.send()
+            else:
+                session.advance(next(script))
+            frame_times.append(time.perf_counter() - start)
+    ticks = min(s.frame for s in sessions)
+    # Terminar de intercambiar entradas para que todo quede confirmado
+    while any(s.confirmed < ticks for s in sessions):
+        now[0] += 1 / tick_rate
+        for session in sessions:
+            session.poll()
+            session.send()
+
+    final = ticks - 1
+    offline = Game('multi', seed=game_seed)
+    for t in range(ticks):
+        offline.step([sessions[0].inputs[0][t], sessions[1].inputs[1][t]])
+    checks = [s.checksums.get(final) for s in sessions]
+    frame_times.sort()
+    for session in sessions:
+        session.close()
+    return {
+        'ticks': ticks,
+        'finished': all(s.finished() for s in sessions),
+        'over_at': [s.over_at for s in sessions],
+        'match': checks[0] == checks[1] == offline.checksum(),
+        'desync': [s.desync for s in sessions],
+        'rollbacks': [s.rollbacks for s in sessions],
+        'rollback_ticks': [s.rollback_ticks for s in sessions],
+        'stalls': [s.stalls for s in sessions],
+        'waits': waits,
+        'frame_ms_p99': frame_times[int(len(frame_times) * 0.99)] * 1000,
+        'frame_ms_max': frame_times[-1] * 1000,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Prueba del multijugador en red por loopback')
+    parser.add_argument('--ticks', type=int, default=3600)
+    parser.add_argument('--delay', type=float, default=0.1, help='latencia en un sentido, en segundos')
+    parser.add_argument('--jitter', type=float, default=0.02)
+    parser.add_argument('--loss', type=float, default=0.1, help='fracción de paquetes perdidos')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--until-over', action='store_true',
+                        help='jugar hasta que las dos sesiones den la partida por terminada (--ticks es el límite)')
+    args = parser.parse_args()
+    result = selftest(args.ticks, args.delay, args.jitter, args.loss, args.seed, until_over=args.until_over)
+    for key, value in result.items():
+        print(f'{key}: {value}')
@@ -0,0 +1,37 @@
+"""Pools de entidades reutilizables.
+
+`acquire` reutiliza una instancia liberada (llamando a su `reset` con los
+mismos argumentos que el constructor) o crea una nueva, y `collect`
+devuelve al pool las entidades muertas de un grupo. Se usan para los
+disparos, las explosiones y la nave misteriosa.
+"""
+
+
+class Pool:
+    def __init__(self, factory):
+        self.factory = factory  # Clase con un método reset(*args) igual a su __init__
+        self.free = []
+        self.created = 0
+        self.reused = 0
+
+    def acquire(self, *args):
+        if self.free:
+            item = self.free.pop()
+            item.reset(*args)
+            self.reused += 1
+            return item
+        self.created += 1
+        return self.factory(*args)
+
+    def release(self, item):
+        self.free.append(item)
+
+    def collect(self, group):
+        """Devuelve los vivos de `group` y libera los muertos."""
+        alive = []
+        for item in group:
+            if item.alive:
+                alive.append(item)
+            else:
+                self.free.append(item)
+        return alive
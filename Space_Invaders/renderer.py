@@ -0,0 +1,79 @@
+"""Renderer de rectángulos sucios.
+
+En lugar de limpiar toda la pantalla y enviar los 800x600 píxeles en cada
+frame, se apuntan los rectángulos que se dibujan. Al empezar el siguiente
+frame solo se borran esos rectángulos (con el fondo) y `display.update`
+recibe únicamente lo que cambió. Si el área sucia pasa de `threshold`
+(fracción de la pantalla) se hace un redibujado completo, que sale más barato.
+"""
+import pygame
+
+
+class DirtyRenderer:
+    def __init__(self, surface, background=None, threshold=0.5, enabled=True):
+        self.surface = surface
+        self.background = background  # Superficie de fondo, o None para negro
+        self.threshold = threshold
+        self.enabled = enabled
+        self.screen_area = surface.get_width() * surface.get_height()
+        self.previous = []
+        self.current = []
+        self.full = True
+        self.blits = 0  # Rectángulos dibujados en el último frame presentado
+
+    def set_background(self, background):
+        self.background = background
+        self.invalidate()
+
+    def invalidate(self):
+        """Fuerza un redibujado completo en el siguiente frame."""
+        self.full = True
+
+    def _restore(self, rect=None):
+        if self.background is None:
+            self.surface.fill((0, 0, 0), rect)
+        elif rect is None:
+            self.surface.blit(self.background, (0, 0))
+        else:
+            self.surface.blit(self.background, rect, rect)
+
+    def clear(self):
+        if self.full or not self.enabled:
+            self._restore()
+        else:
+            for rect in self.previous:
+                self._restore(rect)
+
+    # --- Dibujo ---
+    def blit(self, image, pos, area=None):
+        rect = self.surface.blit(image, pos, area)
+        self.current.append(rect)
+        return rect
+
+    def fill(self, color, rect):
+        rect = self.surface.fill(color, rect)
+        self.current.append(rect)
+        return rect
+
+    def mark(self, rect):
+        """Apunta un rectángulo dibujado por otro medio (p. ej. pygame.draw)."""
+        self.current.append(rect)
+        return rect
+
+    def get_width(self):
+        return self.surface.get_width()
+
+    def get_height(self):
+        return self.surface.get_height()
+
+    def present(self):
+        dirty = self.previous + self.current
+        area = sum(r.width * r.height for r in dirty)
+        if self.full or not self.enabled or area > self.threshold * self.screen_area:
+            pygame.display.update()
+        else:
+            pygame.display.update(dirty)
+        self.blits = len(self.current)
+        self.previous = self.current
+        self.current = []
+        self.full = False
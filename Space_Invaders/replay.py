@@ -0,0 +1,248 @@
+"""Grabación y reproducción de partidas.
+
+Una partida queda decidida por su semilla y por la entrada de cada tick, así
+que basta con guardar eso para volver a jugarla bit a bit. Las entradas de
+todos los jugadores de un tick se empaquetan en un byte (3 bits por jugador)
+y se guardan por tramos: cada tramo es el XOR con el valor anterior (un
+byte) seguido de cuántos ticks dura, en un varint. Como la entrada cambia
+pocas veces por segundo, una partida de varios minutos ocupa unos pocos KB.
+
+Formato: cabecera `HEADER`, una puntuación (i32) por jugador y los tramos.
+La cabecera guarda también el checksum del estado final para comprobar que
+la reproducción coincide, y el `digest` del paquete de niveles con el que
+se jugó (ver levelpack.py): reproducir con otro paquete da un error claro en
+lugar de una partida distinta. Las grabaciones v1 no lo llevan.
+
+    python replay.py partida.sirp            # reproduce sin límite y verifica
+    python replay.py partida.sirp --realtime # reproduce en una ventana
+    python replay.py partida.sirp --levels niveles.txt
+"""
+import struct
+import sys
+import time
+
+import levelpack
+from engine import Game
+
+MAGIC = b'SIRP'
+VERSION = 2
+# magic, versión, modo, jugadores, nivel inicial, ticks/s, semilla, pasos, checksum final,
+# digest del paquete de niveles (0 si no se conoce)
+HEADER = struct.Struct('<4sBBBBHQIIQ')
+HEADER_V1 = struct.Struct('<4sBBBBHQII')
+MODES = ('single', 'multi')
+BITS_PER_PLAYER = 3
+
+
+def pack_inputs(inputs):
+    value = 0
+    for index, bits in enumerate(inputs):
+        value |= (bits & 0b111) << (index * BITS_PER_PLAYER)
+    return value
+
+
+def unpack_inputs(value, players):
+    return [(value >> (index * BITS_PER_PLAYER)) & 0b111 for index in range(players)]
+
+
+def write_varint(out, n):
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def read_varint(data, pos):
+    n = shift = 0
+    while True:
+        if pos >= len(data):
+            raise ValueError('Grabación truncada')
+        byte = data[pos]
+        pos += 1
+        n |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return n, pos
+        shift += 7
+
+
+# --- Grabación ---
+class Recorder:
+    """Apunta la entrada de cada llamada a `game.step` de una partida."""
+
+    def __init__(self, game):
+        self.game = game
+        self.mode = game.mode
+        self.players = len(game.ships)
+        self.level = game.level
+        self.runs = []  # [valor, ticks]
+
+    def step(self, inputs):
+        """Graba `inputs` y avanza la partida; devuelve sus eventos."""
+        if not self.game.over:
+            value = pack_inputs(inputs)
+            if self.runs and self.runs[-1][0] == value:
+                self.runs[-1][1] += 1
+            else:
+                self.runs.append([value, 1])
+        return self.game.step(inputs)
+
+    @property
+    def steps(self):
+        return sum(count for _, count in self.runs)
+
+    def to_bytes(self):
+        game = self.game
+        out = bytearray(HEADER.pack(MAGIC, VERSION, MODES.index(self.mode), self.players, self.level,
+                                    game.tick_rate, game.seed, self.steps, game.checksum(),
+                                    getattr(game.levels, 'digest', 0)))
+        for ship in game.ships:
+            out += struct.pack('<i', ship.score)
+        previous = 0
+        for value, count in self.runs:
+            out.append(value ^ previous)
+            write_varint(out, count)
+            previous = value
+        return bytes(out)
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+
+
+# --- Reproducción ---
+class Replay:
+    def __init__(self, mode, players, level, tick_rate, seed, steps, checksum, scores, runs, levels_digest=0):
+        self.mode = mode
+        self.players = players
+        self.level = level
+        self.tick_rate = tick_rate
+        self.seed = seed
+        self.steps = steps
+        self.checksum = checksum
+        self.scores = scores
+        self.runs = runs  # [(valor, ticks)]
+        self.levels_digest = levels_digest
+
+    @classmethod
+    def from_bytes(cls, data):
+        if len(data) < 5 or data[:4] != MAGIC or data[4] not in (1, VERSION):
+            raise ValueError(f'No es una grabación v1-v{VERSION}')
+        header = HEADER_V1 if data[4] == 1 else HEADER
+        if len(data) < header.size:
+            raise ValueError('Grabación truncada')
+        if header is HEADER_V1:
+            fields, levels_digest = HEADER_V1.unpack_from(data, 0), 0
+        else:
+            *fields, levels_digest = HEADER.unpack_from(data, 0)
+        pos = header.size
+        _, _, mode, players, level, tick_rate, seed, steps, checksum = fields
+        if mode >= len(MODES):
+            raise ValueError(f'Modo de juego desconocido: {mode}')
+        if len(data) < pos + 4 * players:
+            raise ValueError('Grabación truncada')
+        scores = list(struct.unpack_from(f'<{players}i', data, pos))
+        pos += 4 * players
+        runs = []
+        value = 0
+        while pos < len(data):
+            value ^= data[pos]
+            count, pos = read_varint(data, pos + 1)
+            runs.append((value, count))
+        if sum(count for _, count in runs) != steps:
+            raise ValueError('Grabación truncada')
+        return cls(MODES[mode], players, level, tick_rate, seed, steps, checksum, scores, runs, levels_digest)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
+
+    def new_game(self, levels=None):
+        """Partida inicial con `levels` (por defecto, el paquete activo), que debe ser el grabado."""
+        levels = levels if levels is not None else levelpack.get()
+        digest = getattr(levels, 'digest', 0)
+        if self.levels_digest and digest != self.levels_digest:
+            raise ValueError(f'La grabación se hizo con otro paquete de niveles ({self.levels_digest:016x}, '
+                             f'el activo es {digest:016x}); indícalo con SPACE_INVADERS_LEVELS o --levels')
+        return Game(self.mode, seed=self.seed, level=self.level, tick_rate=self.tick_rate, levels=levels)
+
+    def inputs(self):
+        """Genera la entrada de cada tick, en orden."""
+        for value, count in self.runs:
+            inputs = unpack_inputs(value, self.players)
+            for _ in range(count):
+                yield inputs
+
+    def run(self, game=None):
+        """Reproduce la partida sin límite de velocidad y la devuelve terminada."""
+        game = game or self.new_game()
+        step = game.step
+        for inputs in self.inputs():
+            step(inputs)
+        return game
+
+    def verify(self, game):
+        """Lista de diferencias entre `game` y lo grabado (vacía si coinciden)."""
+        errors = []
+        scores = [ship.score for ship in game.ships]
+        if scores != self.scores:
+            errors.append(f'puntuaciones {scores} != {self.scores}')
+        if game.checksum() != self.checksum:
+            errors.append(f'checksum {game.checksum():08x} != {self.checksum:08x}')
+        return errors
+
+
+def play_realtime(replay, render_rate=60, levels=None):
+    """Reproduce la grabación en una ventana, a la velocidad a la que se jugó.
+
+    Devuelve la partida y si se llegó al final de la grabación.
+    """
+    import pygame
+    import app
+    from game_objects import draw_world, play_events
+    from renderer import DirtyRenderer
+    from timestep import FixedTimestep
+
+    screen = app.bootstrap("Space Invaders - Replay")
+    clock = app.clock()
+    renderer = DirtyRenderer(screen)
+    game = replay.new_game(levels)
+    timestep = FixedTimestep(game.tick_rate)
+    inputs = replay.inputs()
+    clock.tick()
+    while True:
+        elapsed = clock.tick(render_rate) / 1000
+        renderer.clear()
+        for e in pygame.event.get():
+            if e.type == pygame.QUIT:
+                return game, False
+        for _ in range(timestep.advance(elapsed)):
+            tick_inputs = next(inputs, None)
+            if tick_inputs is None:
+                return game, True
+            play_events(game.step(tick_inputs))
+        draw_world(renderer, game, timestep.alpha)
+        renderer.present()
+
+
+if __name__ == '__main__':
+    levels = levelpack.load(sys.argv[sys.argv.index('--levels') + 1]) if '--levels' in sys.argv else None
+    try:
+        replay = Replay.load(sys.argv[1])
+        start = time.perf_counter()
+        if '--realtime' in sys.argv:
+            game, finished = play_realtime(replay, levels=levels)
+        else:
+            game, finished = replay.run(replay.new_game(levels)), True
+    except ValueError as e:
+        sys.exit(str(e))
+    elapsed = time.perf_counter() - start
+    print(f"{replay.mode}, semilla {replay.seed}, {replay.steps} ticks a {replay.tick_rate} Hz "
+          f"en {elapsed:.2f} s ({replay.steps / elapsed:.0f} ticks/s)")
+    if not finished:
+        sys.exit(0)
+    errors = replay.verify(game)
+    if errors:
+        print('La reproducción no coincide: ' + '; '.join(errors))
+        sys.exit(1)
+    print(f"Puntuaciones {[ship.score for ship in game.ships]}: OK")
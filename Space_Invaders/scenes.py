@@ -0,0 +1,154 @@
+"""Bucle principal único y escenas.
+
+`run()` es el único bucle del juego. Cada pantalla es una `Scene` que atiende
+eventos, se actualiza con el tiempo transcurrido y se dibuja en su
+`DirtyRenderer`. Para cambiar de pantalla una escena llama a `switch()` con
+la siguiente (o con `QUIT`) y el bucle hace el cambio al acabar el frame;
+la escena anterior deja de estar referenciada.
+"""
+import pygame
+
+import app
+import metrics
+from renderer import DirtyRenderer
+
+SCREEN_WIDTH, SCREEN_HEIGHT = app.SCREEN_SIZE
+WHITE = (255, 255, 255)
+QUIT = object()  # Escena "salir del juego"
+
+
+class Scene:
+    name = 'scene'  # Etiqueta de la escena en las métricas
+    caption = "Space Invaders"
+    fps = 60
+
+    def __init__(self):
+        self.next = None
+        self.renderer = None
+
+    def enter(self):
+        """Se llama al pasar a esta escena; por defecto dibuja en una pantalla negra."""
+        screen = app.bootstrap(self.caption)
+        if self.renderer is None:
+            self.renderer = DirtyRenderer(screen)
+        self.renderer.invalidate()
+
+    def leave(self):
+        pass
+
+    def switch(self, scene):
+        if self.next is not QUIT:  # Cerrar la ventana gana a cualquier otro cambio
+            self.next = scene
+
+    def handle_event(self, e):
+        pass
+
+    def update(self, elapsed):
+        pass
+
+    def draw(self):
+        pass
+
+
+def run(scene):
+    """Ejecuta escenas hasta que una pasa a `QUIT` o se cierra la ventana."""
+    clock = app.clock()
+    stats = metrics.get()
+    scene.enter()
+    clock.tick()
+    elapsed = 0.0  # El primer frame se dibuja sin esperar al reloj
+    while True:
+        stats.begin(scene.name)
+        renderer = scene.renderer
+        renderer.clear()
+
+        for e in pygame.event.get():
+            if e.type == pygame.QUIT:
+                scene.switch(QUIT)
+            stats.handle_event(e)
+            scene.handle_event(e)
+        stats.stage('events')
+
+        scene.update(elapsed)
+        stats.stage('update')
+        scene.draw()
+        stats.stage('draw')
+
+        stats.draw_overlay(renderer)
+        renderer.present()
+        stats.stage('present')
+        stats.end(renderer)
+        app.first_frame()
+
+        if scene.next is not None:
+            scene.leave()
+            scene = scene.next
+            if scene is QUIT:
+                return
+            scene.enter()
+        elapsed = clock.tick(scene.fps) / 1000
+
+
+def menu_scene():
+    import main_menu
+    return main_menu.MenuScene()
+
+
+# --- Escenas comunes a los dos modos ---
+class NameEntryScene(Scene):
+    """Pide un nombre por cada texto de `prompts` y luego pasa a `on_done(nombres)`."""
+    name = 'names'
+
+    def __init__(self, prompts, on_done, caption=Scene.caption):
+        super().__init__()
+        self.prompts = prompts
+        self.on_done = on_done
+        self.caption = caption
+        self.names = []
+        self.text = ''
+        self.input_rect = pygame.Rect(SCREEN_WIDTH // 2 - 150, SCREEN_HEIGHT // 2 - 32, 300, 64)
+        self.color_active = pygame.Color('lightskyblue3')
+
+    def handle_event(self, e):
+        if e.type != pygame.KEYDOWN:
+            return
+        if e.key == pygame.K_RETURN:
+            if self.text:
+                self.names.append(self.text)
+                self.text = ''
+                if len(self.names) == len(self.prompts):
+                    self.switch(self.on_done(self.names))
+        elif e.key == pygame.K_BACKSPACE:
+            self.text = self.text[:-1]
+        elif len(self.text) < 10 and e.unicode.isalnum():
+            self.text += e.unicode
+
+    def draw(self):
+        font = app.font(32)
+        renderer = self.renderer
+        prompt = font.render(self.prompts[min(len(self.names), len(self.prompts) - 1)], True, WHITE)
+        renderer.blit(prompt, (SCREEN_WIDTH // 2 - prompt.get_width() // 2, SCREEN_HEIGHT // 2 - 80))
+        renderer.blit(font.render(self.text, True, WHITE), (self.input_rect.x + 10, self.input_rect.y + 10))
+        renderer.mark(pygame.draw.rect(renderer.surface, self.color_active, self.input_rect, 2))
+
+
+class EndScene(Scene):
+    """Pantalla de fin de partida: muestra `lines` durante `duration` segundos sin bloquear."""
+    name = 'end'
+
+    def __init__(self, lines, duration=5.0, then=menu_scene):
+        super().__init__()
+        self.lines = lines  # [(texto, color, desplazamiento vertical desde el centro)]
+        self.remaining = duration
+        self.then = then
+
+    def update(self, elapsed):
+        self.remaining -= elapsed
+        if self.remaining <= 0:
+            self.switch(self.then())
+
+    def draw(self):
+        font = app.font(24)
+        for text, color, dy in self.lines:
+            surface = font.render(text, True, color)
+            self.renderer.blit(surface, (SCREEN_WIDTH // 2 - surface.get_width() // 2, SCREEN_HEIGHT // 2 + dy))
@@ -0,0 +1,176 @@
+"""Almacén de puntuaciones sobre SQLite en modo WAL.
+
+Guarda el historial completo (no solo el top 5) y cada guardado es una
+transacción, así que un cierre inesperado no deja el ranking a medias y dos
+instancias del juego pueden escribir a la vez sin pisarse. Los índices por
+(modo, puntuación) y (modo, nombre, puntuación) resuelven el top-K y la mejor
+marca de un jugador sin recorrer la tabla.
+
+Para la posición de una puntuación, `score_tree` es un árbol de Fenwick por
+modo sobre todos los valores posibles (i32): cada guardado suma 1 a los
+nodos que cubren su valor en la misma transacción, y contar cuántas
+puntuaciones hay por encima de otra lee como mucho 33 nodos, así que cuesta
+lo mismo con cien partidas que con millones. Los nodos que nadie ha tocado
+no se guardan.
+"""
+import json
+import os
+import sqlite3
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    id INTEGER PRIMARY KEY,
+    mode TEXT NOT NULL,
+    name TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scores_by_mode ON scores (mode, score DESC);
+CREATE INDEX IF NOT EXISTS scores_by_player ON scores (mode, name, score DESC);
+CREATE TABLE IF NOT EXISTS score_tree (
+    mode TEXT NOT NULL,
+    node INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (mode, node)
+) WITHOUT ROWID;
+"""
+SCHEMA_VERSION = 1  # Desde la 1 existe score_tree; las bases anteriores lo construyen al abrirse
+
+TREE_SIZE = 2 ** 32
+SCORE_OFFSET = 2 ** 31 + 1  # La puntuación -2**31 va en la posición 1 y la 2**31 - 1 en TREE_SIZE
+
+
+def tree_position(score):
+    return min(max(int(score), -2 ** 31), 2 ** 31 - 1) + SCORE_OFFSET
+
+
+def update_nodes(position):
+    """Nodos del árbol que cuentan una puntuación en `position`."""
+    nodes = []
+    while position <= TREE_SIZE:
+        nodes.append(position)
+        position += position & -position
+    return nodes
+
+
+def prefix_nodes(position):
+    """Nodos que suman las puntuaciones de las posiciones 1..`position`."""
+    nodes = []
+    while position > 0:
+        nodes.append(position)
+        position &= position - 1
+    return nodes
+
+
+class ScoreStore:
+    def __init__(self, path, legacy=None):
+        self.path = path
+        self.legacy = legacy or {}  # modo -> fichero JSON antiguo a importar
+        self.conn = None
+        self.saves = 0  # Guardados hechos por esta conexión
+
+    def connect(self):
+        if self.conn is None:
+            self.conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute('PRAGMA synchronous=FULL')
+            self.conn.executescript(SCHEMA)
+            self.build_tree()
+            self.import_legacy()
+        return self.conn
+
+    def build_tree(self):
+        """Rellena score_tree con las puntuaciones que ya había si la base es de antes de tenerlo."""
+        conn = self.conn
+        if conn.execute('PRAGMA user_version').fetchone()[0] >= SCHEMA_VERSION:
+            return
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            # Otra instancia puede haberlo hecho mientras esperábamos el bloqueo
+            if conn.execute('PRAGMA user_version').fetchone()[0] < SCHEMA_VERSION:
+                counts = {}
+                for mode, score in conn.execute('SELECT mode, score FROM scores'):
+                    for node in update_nodes(tree_position(score)):
+                        counts[mode, node] = counts.get((mode, node), 0) + 1
+                conn.execute('DELETE FROM score_tree')
+                conn.executemany('INSERT INTO score_tree (mode, node, count) VALUES (?, ?, ?)',
+                                 [(mode, node, count) for (mode, node), count in counts.items()])
+                conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+
+    def import_legacy(self):
+        conn = self.conn
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            if conn.execute('SELECT 1 FROM scores LIMIT 1').fetchone() is None:
+                for mode, json_path in self.legacy.items():
+                    if os.path.exists(json_path):
+                        with open(json_path, 'r') as f:
+                            rows = json.load(f)
+                        for row in rows:
+                            self.insert(mode, row['name'], row['score'], 0.0)
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+
+    def version(self):
+        """Cambia cada vez que alguien (este proceso u otro) guarda una puntuación."""
+        data_version = self.connect().execute('PRAGMA data_version').fetchone()[0]
+        return (data_version, self.saves)
+
+    # --- Escritura ---
+    def add(self, mode, name, score):
+        conn = self.connect()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            self.insert(mode, name, score, time.time())
+        self.saves += 1
+
+    def insert(self, mode, name, score, created):
+        """Guarda una fila y la cuenta en score_tree (dentro de la transacción abierta)."""
+        self.conn.execute('INSERT INTO scores (mode, name, score, created) VALUES (?, ?, ?, ?)',
+                          (mode, name, int(score), created))
+        self.conn.executemany(
+            'INSERT INTO score_tree (mode, node, count) VALUES (?, ?, 1) '
+            'ON CONFLICT (mode, node) DO UPDATE SET count = count + 1',
+            [(mode, node) for node in update_nodes(tree_position(score))])
+
+    # --- Consultas ---
+    def top(self, mode, k=5):
+        rows = self.connect().execute(
+            'SELECT name, score FROM scores WHERE mode = ? ORDER BY score DESC, id LIMIT ?', (mode, k))
+        return [{'name': name, 'score': score} for name, score in rows]
+
+    def best(self, mode, name):
+        row = self.connect().execute(
+            'SELECT score FROM scores WHERE mode = ? AND name = ? ORDER BY score DESC LIMIT 1',
+            (mode, name)).fetchone()
+        return row[0] if row else None
+
+    def rank(self, mode, score):
+        """Posición (empezando en 1) que ocuparía `score` en el historial de `mode`."""
+        # Las que hay por encima son el total (la raíz) menos las que no superan a `score`
+        nodes = prefix_nodes(tree_position(score))
+        counts = self.tree_counts(mode, nodes + [TREE_SIZE])
+        return counts.get(TREE_SIZE, 0) - sum(counts.get(node, 0) for node in nodes) + 1
+
+    def count(self, mode):
+        return self.tree_counts(mode, [TREE_SIZE]).get(TREE_SIZE, 0)
+
+    def tree_counts(self, mode, nodes):
+        # Una sola consulta: todos los nodos salen de la misma versión de la base
+        nodes = sorted(set(nodes))
+        rows = self.connect().execute(
+            f'SELECT node, count FROM score_tree WHERE mode = ? AND node IN ({",".join("?" * len(nodes))})',
+            [mode] + nodes)
+        return dict(rows)
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
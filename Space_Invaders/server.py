@@ -0,0 +1,336 @@
+"""Servidor de partidas sin pantalla.
+
+Un solo proceso aloja muchas partidas independientes (reglas 'single' y
+'multi' del motor) y las simula él mismo: los clientes solo envían su
+entrada y reciben el estado. La red va sobre UDP con asyncio y un único
+planificador avanza todas las partidas en cada tick, así que el coste por
+partida es el de `Game.step` y poco más. Se apunta el tiempo de CPU que
+gasta cada partida para saber cuántas caben por núcleo.
+
+    python server.py --port 6000                 # servidor
+    python server.py --selftest 200 --duration 10  # 200 clientes de prueba en local
+"""
+import argparse
+import asyncio
+import random
+import struct
+import time
+
+from engine import Game, TICK_RATE
+from timestep import FixedTimestep
+
+MAGIC = b'SISV'
+JOIN, INPUT, LEAVE, JOINED, STATE = 1, 2, 3, 10, 11
+MODES = ('single', 'multi')
+
+HEADER = struct.Struct('<4sB')
+JOIN_MSG = struct.Struct('<4sBB')  # modo; después el nombre en UTF-8
+INPUT_MSG = struct.Struct('<4sBIBB')  # partida, jugador, bits
+LEAVE_MSG = struct.Struct('<4sBIB')  # partida, jugador
+JOINED_MSG = struct.Struct('<4sBIBBQ')  # partida, jugador, modo, semilla
+STATE_MSG = struct.Struct('<4sBIIB??IB')  # partida, tick, nivel, terminada, victoria, checksum, jugadores
+PLAYER_STATE = struct.Struct('<ib')  # puntuación, vidas
+# Mensajes que acepta el servidor; los más cortos que su formato se descartan
+REQUESTS = {JOIN: JOIN_MSG, INPUT: INPUT_MSG, LEAVE: LEAVE_MSG}
+
+STATE_INTERVAL = 6  # Ticks entre dos envíos de estado (10 por segundo a 60 Hz)
+FINAL_STATES = 3  # Veces que se envía el estado final antes de cerrar la partida
+IDLE_TIMEOUT = 10.0  # Segundos sin noticias de un jugador para dar la partida por abandonada
+
+
+class Match:
+    def __init__(self, match_id, mode, seed):
+        self.id = match_id
+        self.mode = mode
+        self.seed = seed
+        self.game = Game(mode, seed=seed)
+        players = len(self.game.ships)
+        self.addresses = [None] * players
+        self.names = [''] * players
+        self.inputs = [0] * players
+        self.last_seen = [0.0] * players
+        self.cpu_ns = 0  # Tiempo de CPU gastado en simular esta partida
+        self.final_sent = 0
+
+    @property
+    def full(self):
+        return None not in self.addresses
+
+    def add_player(self, address, name, now):
+        index = self.addresses.index(None)
+        self.addresses[index] = address
+        self.names[index] = name
+        self.last_seen[index] = now
+        return index
+
+    def idle(self, now):
+        """Si algún jugador que ya se unió lleva más de IDLE_TIMEOUT sin dar señales."""
+        return any(addr is not None and now - seen > IDLE_TIMEOUT
+                   for addr, seen in zip(self.addresses, self.last_seen))
+
+    def step(self):
+        # La partida empieza cuando están todos sus jugadores
+        if self.full and not self.game.over:
+            start = time.thread_time_ns()
+            self.game.step(self.inputs)
+            self.cpu_ns += time.thread_time_ns() - start
+
+    def state(self):
+        game = self.game
+        data = STATE_MSG.pack(MAGIC, STATE, self.id, game.tick, game.level, game.over, game.victory,
+                              game.checksum(), len(game.ships))
+        return data + b''.join(PLAYER_STATE.pack(ship.score, ship.lives) for ship in game.ships)
+
+
+class MatchServer:
+    def __init__(self, tick_rate=TICK_RATE, seed=None, clock=time.monotonic):
+        self.tick_rate = tick_rate
+        self.rng = random.Random(seed)
+        self.clock = clock
+        self.matches = {}
+        self.waiting = {}  # modo -> partida a la que le faltan jugadores
+        self.next_id = 1
+        self.transport = None
+        self.tick = 0
+        self.tick_ns = 0  # Tiempo total dentro de los ticks (todas las partidas)
+        self.max_tick_ns = 0
+        self.finished = 0
+        self.timestep = FixedTimestep(tick_rate)
+
+    # --- Mensajes ---
+    def datagram_received(self, data, addr):
+        if len(data) < HEADER.size or data[:4] != MAGIC:
+            return
+        kind = data[4]
+        request = REQUESTS.get(kind)
+        if request is None or len(data) < request.size:
+            return
+        if kind == INPUT:
+            _, _, match_id, player, bits = INPUT_MSG.unpack_from(data)
+            match = self.matches.get(match_id)
+            if match is not None and player < len(match.addresses) and match.addresses[player] == addr:
+                match.inputs[player] = bits
+                match.last_seen[player] = self.clock()
+        elif kind == JOIN:
+            _, _, mode = JOIN_MSG.unpack_from(data)
+            if mode < len(MODES):
+                self.join(addr, MODES[mode], data[JOIN_MSG.size:].decode('utf-8', 'replace'))
+        elif kind == LEAVE:
+            _, _, match_id, player = LEAVE_MSG.unpack_from(data)
+            match = self.matches.get(match_id)
+            if match is not None and player < len(match.addresses) and match.addresses[player] == addr:
+                self.close(match)
+
+    def join(self, addr, mode, name):
+        # Un JOIN repetido (se perdió la respuesta) recibe la misma plaza
+        for match in self.matches.values():
+            if addr in match.addresses:
+                self.send_joined(match, match.addresses.index(addr))
+                return
+        match = self.waiting.get(mode)
+        if match is None:
+            match = self.matches[self.next_id] = Match(self.next_id, mode, self.rng.randrange(2 ** 32))
+            self.next_id += 1
+        index = match.add_player(addr, name, self.clock())
+        self.waiting[mode] = None if match.full else match
+        self.send_joined(match, index)
+
+    def send_joined(self, match, index):
+        self.send(JOINED_MSG.pack(MAGIC, JOINED, match.id, index, MODES.index(match.mode), match.seed),
+                  match.addresses[index])
+
+    def send(self, data, addr):
+        if self.transport is not None:
+            self.transport.sendto(data, addr)
+
+    def broadcast(self, match):
+        data = match.state()
+        for addr in match.addresses:
+            if addr is not None:
+                self.send(data, addr)
+
+    def close(self, match):
+        self.matches.pop(match.id, None)
+        if self.waiting.get(match.mode) is match:
+            self.waiting[match.mode] = None
+
+    # --- Planificador ---
+    def step_all(self):
+        """Un tick de todas las partidas, y el estado a los clientes cada STATE_INTERVAL."""
+        start = time.perf_counter_ns()
+        self.tick += 1
+        send_state = self.tick % STATE_INTERVAL == 0
+        now = self.clock()
+        for match in list(self.matches.values()):
+            match.step()
+            if match.game.over:
+                self.broadcast(match)
+                match.final_sent += 1
+                if match.final_sent >= FINAL_STATES:
+                    self.finished += 1
+                    self.close(match)
+            elif match.idle(now):
+                # También las que esperan jugadores: si no, la plaza libre sería de un cliente caído
+                self.close(match)
+            elif send_state and match.full:
+                self.broadcast(match)
+        elapsed = time.perf_counter_ns() - start
+        self.tick_ns += elapsed
+        self.max_tick_ns = max(self.max_tick_ns, elapsed)
+
+    async def run(self, stop=None):
+        dt = 1 / self.tick_rate
+        last = time.perf_counter()
+        while stop is None or not stop.is_set():
+            await asyncio.sleep(max(0.0, dt - (time.perf_counter() - last)))
+            now = time.perf_counter()
+            for _ in range(self.timestep.advance(now - last)):
+                self.step_all()
+            last = now
+
+    def stats(self):
+        matches = list(self.matches.values())
+        ticks = sum(m.game.tick for m in matches) or 1
+        cpu_ns = sum(m.cpu_ns for m in matches)
+        per_match_tick_us = cpu_ns / ticks / 1000
+        return {
+            'matches': len(matches),
+            'playing': sum(m.full and not m.game.over for m in matches),
+            'finished': self.finished,
+            'ticks': self.tick,
+            'dropped_ticks': self.timestep.dropped,
+            'tick_ms_mean': self.tick_ns / max(self.tick, 1) / 1e6,
+            'tick_ms_max': self.max_tick_ns / 1e6,
+            'cpu_us_per_match_tick': per_match_tick_us,
+            # Partidas que caben en un núcleo a esta frecuencia de ticks
+            'capacity_per_core': int(1e6 / (per_match_tick_us * self.tick_rate)) if per_match_tick_us else None,
+        }
+
+
+class ServerProtocol(asyncio.DatagramProtocol):
+    def __init__(self, server):
+        self.server = server
+
+    def connection_made(self, transport):
+        self.server.transport = transport
+
+    def datagram_received(self, data, addr):
+        self.server.datagram_received(data, addr)
+
+
+async def serve(host='0.0.0.0', port=6000, tick_rate=TICK_RATE, stats_interval=5.0, stop=None):
+    loop = asyncio.get_running_loop()
+    server = MatchServer(tick_rate)
+    transport, _ = await loop.create_datagram_endpoint(lambda: ServerProtocol(server), local_addr=(host, port))
+
+    async def report():
+        while True:
+            await asyncio.sleep(stats_interval)
+            print(' '.join(f'{k}={v:.3f}' if isinstance(v, float) else f'{k}={v}'
+                           for k, v in server.stats().items()), flush=True)
+
+    reporter = asyncio.create_task(report()) if stats_interval else None
+    try:
+        await server.run(stop)
+    finally:
+        if reporter:
+            reporter.cancel()
+        transport.close()
+    return server
+
+
+# --- Clientes de prueba ---
+class BotClient(asyncio.DatagramProtocol):
+    """Cliente con entrada programada: se une, juega y guarda el último estado recibido."""
+
+    def __init__(self, mode, name, seed):
+        self.mode = mode
+        self.name = name
+        self.rng = random.Random(seed)
+        self.transport = None
+        self.match_id = None
+        self.player = None
+        self.state = None
+        self.done = asyncio.get_running_loop().create_future()
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        if data[:4] != MAGIC:
+            return
+        if data[4] == JOINED:
+            _, _, self.match_id, self.player, _, _ = JOINED_MSG.unpack_from(data)
+        elif data[4] == STATE:
+            _, _, match_id, tick, level, over, victory, checksum, players = STATE_MSG.unpack_from(data)
+            scores = [PLAYER_STATE.unpack_from(data, STATE_MSG.size + i * PLAYER_STATE.size)[0]
+                      for i in range(players)]
+            self.state = {'tick': tick, 'level': level, 'over': over, 'victory': victory, 'scores': scores}
+            if over and not self.done.done():
+                self.done.set_result(self.state)
+
+    async def play(self, tick_rate=TICK_RATE):
+        bits = 0
+        join = JOIN_MSG.pack(MAGIC, JOIN, MODES.index(self.mode)) + self.name.encode('utf-8')
+        next_join = 0.0
+        while not self.done.done():
+            now = time.monotonic()
+            if self.match_id is None:
+                if now >= next_join:
+                    self.transport.sendto(join)
+                    next_join = now + 0.5
+            else:
+                if self.rng.random() < 0.08:
+                    bits = self.rng.choice((0, 1, 2, 4, 5, 6))
+                self.transport.sendto(INPUT_MSG.pack(MAGIC, INPUT, self.match_id, self.player, bits))
+            await asyncio.sleep(1 / tick_rate)
+
+    def leave(self):
+        if self.match_id is not None:
+            self.transport.sendto(LEAVE_MSG.pack(MAGIC, LEAVE, self.match_id, self.player))
+        self.transport.close()
+
+
+async def selftest(clients=200, duration=10.0, multi_ratio=0.25, port=0):
+    """Levanta el servidor y `clients` bots en 127.0.0.1 durante `duration` segundos."""
+    loop = asyncio.get_running_loop()
+    server = MatchServer()
+    transport, _ = await loop.create_datagram_endpoint(lambda: ServerProtocol(server), local_addr=('127.0.0.1', port))
+    address = transport.get_extra_info('sockname')
+    stop = asyncio.Event()
+    server_task = asyncio.create_task(server.run(stop))
+
+    bots = []
+    for i in range(clients):
+        mode = 'multi' if i < clients * multi_ratio else 'single'
+        _, bot = await loop.create_datagram_endpoint(lambda: BotClient(mode, f'bot{i}', i), remote_addr=address)
+        bots.append(bot)
+    tasks = [asyncio.create_task(bot.play()) for bot in bots]
+    await asyncio.sleep(duration)
+    stats = server.stats()
+    stop.set()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(server_task, *tasks, return_exceptions=True)
+    for bot in bots:
+        bot.leave()
+    transport.close()
+    stats['clients_with_state'] = sum(bot.state is not None for bot in bots)
+    return stats
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Servidor de partidas sin pantalla')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=6000)
+    parser.add_argument('--selftest', type=int, metavar='CLIENTES', help='prueba local con bots')
+    parser.add_argument('--duration', type=float, default=10.0, help='segundos de la prueba')
+    args = parser.parse_args()
+    if args.selftest:
+        for key, value in asyncio.run(selftest(args.selftest, args.duration)).items():
+            print(f'{key}: {value}')
+    else:
+        try:
+            asyncio.run(serve(args.host, args.port))
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,164 @@
+"""Pruebas de resistencia y de equilibrio de niveles.
+
+Reparte miles de partidas sin pantalla entre un pool de procesos (uno por
+núcleo por defecto). Cada partida empieza en un nivel del paquete activo
+con una semilla y una política de entrada, y el trabajador devuelve su
+resultado en cuanto acaba; el proceso principal los va agregando (y,
+si se pide, escribiéndolos uno por línea) y al final deja un informe por
+nivel de inicio: puntuación, nivel alcanzado, victorias y coste por tick.
+
+    python soak.py --games 2000                # todos los niveles, semillas 0..N
+    python soak.py --levels 0 5 10 --policy sweep -o soak-sweep.json
+    python soak.py --games 500 --results soak-results.jsonl
+
+Las partidas son independientes y el resultado de cada una es pequeño,
+así que el rendimiento crece casi linealmente con los núcleos.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import time
+from multiprocessing import Pool
+
+from engine import FIRE, LEFT, RIGHT, SCREEN_WIDTH, Game, random_policy
+import levelpack
+
+SLOW_FACTOR = 1.5  # Niveles con un coste por tick por encima de esta proporción de la mediana
+
+
+def sweep_policy(rng):
+    """Política programada: barre la pantalla de lado a lado disparando siempre."""
+    directions = {}
+
+    def policy(game, index):
+        ship = game.ships[index]
+        if ship.x <= 0:
+            directions[index] = RIGHT
+        elif ship.x + ship.w >= SCREEN_WIDTH:
+            directions[index] = LEFT
+        return directions.setdefault(index, RIGHT) | FIRE
+    return policy
+
+
+POLICIES = {'random': random_policy, 'sweep': sweep_policy}
+
+
+def play_match(job):
+    """Juega una partida y devuelve su resultado (se ejecuta en un trabajador)."""
+    mode, level, seed, policy_name, max_ticks = job
+    game = Game(mode, seed=seed, level=level)
+    policy = POLICIES[policy_name](random.Random(seed))
+    players = range(len(game.ships))
+    start = time.perf_counter()
+    while not game.over and game.tick < max_ticks:
+        game.step([policy(game, i) for i in players])
+    elapsed = time.perf_counter() - start
+    return {
+        'mode': mode,
+        'start_level': level,
+        'seed': seed,
+        'policy': policy_name,
+        'level': game.level,
+        'scores': [ship.score for ship in game.ships],
+        'victory': game.victory,
+        'finished': game.over,
+        'ticks': game.tick,
+        'us_per_tick': elapsed / max(game.tick, 1) * 1e6,
+    }
+
+
+def jobs(levels, games, mode, policy, max_ticks, seed=0):
+    """`games` partidas repartidas por igual entre `levels`."""
+    for i in range(games):
+        yield mode, levels[i % len(levels)], seed + i, policy, max_ticks
+
+
+def summarize(results):
+    by_level = {}
+    for result in results:
+        by_level.setdefault(result['start_level'], []).append(result)
+    levels = {}
+    for level, group in sorted(by_level.items()):
+        scores = [sum(r['scores']) for r in group]
+        costs = sorted(r['us_per_tick'] for r in group)
+        levels[level] = {
+            'games': len(group),
+            'score_mean': statistics.fmean(scores),
+            'score_median': statistics.median(scores),
+            'levels_cleared_mean': statistics.fmean(r['level'] - level for r in group),
+            'victories': sum(r['victory'] for r in group),
+            'unfinished': sum(not r['finished'] for r in group),
+            'ticks_mean': statistics.fmean(r['ticks'] for r in group),
+            'us_per_tick_median': statistics.median(costs),
+            'us_per_tick_p99': costs[min(len(costs) - 1, int(len(costs) * 0.99))],
+        }
+    median_cost = statistics.median(s['us_per_tick_median'] for s in levels.values()) if levels else 0
+    slow = [level for level, s in levels.items() if s['us_per_tick_median'] > median_cost * SLOW_FACTOR]
+    return {'levels': levels, 'slow_levels': slow}
+
+
+def run(levels, games, mode='single', policy='random', max_ticks=20000, processes=None,
+        results_path=None, seed=0, chunksize=4):
+    results = []
+    out = open(results_path, 'w') if results_path else None
+    start = time.perf_counter()
+    try:
+        with Pool(processes) as pool:
+            for result in pool.imap_unordered(play_match, jobs(levels, games, mode, policy, max_ticks, seed),
+                                              chunksize):
+                results.append(result)
+                if out:
+                    out.write(json.dumps(result) + '\n')
+    finally:
+        if out:
+            out.close()
+    elapsed = time.perf_counter() - start
+    ticks = sum(r['ticks'] for r in results)
+    report = summarize(results)
+    report.update({
+        'mode': mode,
+        'policy': policy,
+        'processes': processes or os.cpu_count(),
+        'games': len(results),
+        'ticks': ticks,
+        'seconds': elapsed,
+        'ticks_per_second': ticks / elapsed if elapsed else 0.0,
+    })
+    return report
+
+
+def print_report(report):
+    print(f"{report['games']} partidas ({report['mode']}, {report['policy']}) en {report['processes']} procesos: "
+          f"{report['ticks']} ticks en {report['seconds']:.1f} s ({report['ticks_per_second']:.0f} ticks/s)")
+    print(f"{'nivel':>5} {'partidas':>8} {'puntos':>8} {'mediana':>8} {'superados':>9} {'victorias':>9} "
+          f"{'ticks':>7} {'us/tick':>8} {'p99':>7}")
+    for level, s in report['levels'].items():
+        slow = ' lento' if level in report['slow_levels'] else ''
+        print(f"{level:>5} {s['games']:>8} {s['score_mean']:>8.0f} {s['score_median']:>8.0f} "
+              f"{s['levels_cleared_mean']:>9.2f} {s['victories']:>9} {s['ticks_mean']:>7.0f} "
+              f"{s['us_per_tick_median']:>8.1f} {s['us_per_tick_p99']:>7.1f}{slow}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Partidas sin pantalla en paralelo, con informe por nivel')
+    parser.add_argument('--games', type=int, help='partidas (por defecto, 20 por nivel)')
+    parser.add_argument('--levels', type=int, nargs='*', help='niveles de inicio (por defecto todos)')
+    parser.add_argument('--mode', choices=('single', 'multi'), default='single')
+    parser.add_argument('--policy', choices=sorted(POLICIES), default='random')
+    parser.add_argument('--max-ticks', type=int, default=20000)
+    parser.add_argument('--processes', type=int, help='procesos del pool (por defecto, uno por núcleo)')
+    parser.add_argument('--seed', type=int, default=0, help='primera semilla')
+    parser.add_argument('--results', help='fichero JSON Lines con el resultado de cada partida')
+    parser.add_argument('-o', '--output', default='soak-report.json', help='informe resumido en JSON')
+    args = parser.parse_args()
+    count = len(levelpack.get())  # El mismo paquete que cargará cada partida (SPACE_INVADERS_LEVELS)
+    levels = args.levels or list(range(count))
+    if not all(0 <= level < count for level in levels):
+        parser.error(f'el paquete de niveles tiene {count} niveles')
+    report = run(levels, args.games or count * 20, args.mode, args.policy, args.max_ticks, args.processes,
+                 args.results, args.seed)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print_report(report)
@@ -0,0 +1,51 @@
+"""Rejilla uniforme (spatial hash) para la fase amplia de las colisiones.
+
+Cada elemento se registra en las celdas que cubre su rectángulo. Una consulta
+solo mira las celdas ocupadas que toca el rectángulo buscado, así que el coste
+depende de cuántas cosas hay cerca y no del total de entidades.
+"""
+
+
+class SpatialHash:
+    def __init__(self, cell_size=32):
+        self.cell_size = cell_size
+        self.cells = {}
+
+    def _keys(self, x, y, w, h):
+        cs = self.cell_size
+        x0, y0 = int(x) // cs, int(y) // cs
+        x1, y1 = int(x + w - 1) // cs, int(y + h - 1) // cs
+        return [(cx, cy) for cx in range(x0, x1 + 1) for cy in range(y0, y1 + 1)]
+
+    def __len__(self):
+        return len(self.cells)
+
+    def insert(self, item, x, y, w, h):
+        for key in self._keys(x, y, w, h):
+            self.cells.setdefault(key, set()).add(item)
+
+    def remove(self, item, x, y, w, h):
+        for key in self._keys(x, y, w, h):
+            bucket = self.cells.get(key)
+            if bucket is not None:
+                bucket.discard(item)
+                if not bucket:
+                    del self.cells[key]
+
+    def move(self, item, old, new):
+        """Mueve `item` del rectángulo `old` a `new` (tuplas x, y, w, h)."""
+        old_keys = self._keys(*old)
+        new_keys = self._keys(*new)
+        if old_keys == new_keys:
+            return
+        self.remove(item, *old)
+        self.insert(item, *new)
+
+    def query(self, x, y, w, h):
+        found = set()
+        cells = self.cells
+        for key in self._keys(x, y, w, h):
+            bucket = cells.get(key)
+            if bucket:
+                found.update(bucket)
+        return found
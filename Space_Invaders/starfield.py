@@ -0,0 +1,96 @@
+"""Campo de estrellas con NumPy.
+
+Las posiciones, velocidades y colores de las estrellas son arrays: `update`
+las mueve todas con una operación y `draw` escribe sus píxeles directamente
+en la superficie con `pygame.surfarray` (círculos de radio 1 y 2).
+
+Las estrellas más rápidas son también las más brillantes, así que las
+lentas parecen estar más lejos (paralaje).
+
+Para usarlo de fondo dentro de la partida: `SPACE_INVADERS_STARS=2000`.
+"""
+import os
+
+import numpy as np
+import pygame
+
+FRAME_RATE = 60  # Las velocidades van en píxeles por frame a esta frecuencia
+MIN_SPEED, MAX_SPEED = 0.5, 2.0
+# Por debajo de este número se marca cada estrella como rectángulo sucio;
+# por encima sale más barato redibujar la pantalla entera
+MARK_LIMIT = 1000
+
+# Píxeles de cada tamaño respecto al centro, como los dibuja draw.circle
+SHAPES = {
+    1: [(dx, dy) for dx in (-1, 0) for dy in (-1, 0)],
+    2: [(dx, dy) for dx in range(-2, 2) for dy in range(-2, 2) if abs(dx + 0.5) + abs(dy + 0.5) < 3],
+}
+
+
+class Starfield:
+    def __init__(self, count=100, size=(800, 600), seed=None):
+        self.count = count
+        self.width, self.height = size
+        self.rng = np.random.default_rng(seed)
+        rng = self.rng
+        # Lejos de los bordes laterales para no tener que recortar columnas al dibujar
+        self.x = rng.integers(2, self.width - 2, count)
+        self.y = rng.uniform(-self.height, 0, count)  # Empiezan por encima y van entrando
+        self.speed = rng.uniform(MIN_SPEED, MAX_SPEED, count)
+        self.size = rng.integers(1, 3, count)
+        self.of_size = {size: self.size == size for size in SHAPES}
+        # Brillo según la velocidad (paralaje) con un poco de tono al azar
+        depth = (self.speed - MIN_SPEED) / (MAX_SPEED - MIN_SPEED)
+        base = 180 + depth * 50
+        self.rgb = np.clip(base[:, None] + rng.uniform(0, 26, (count, 3)), 0, 255).astype(np.uint32)
+        self.mapped = None
+        self.format = None
+
+    def update(self, elapsed):
+        self.y += self.speed * (elapsed * FRAME_RATE)
+        # Las que salen por abajo vuelven a entrar por arriba en otra columna
+        gone = np.flatnonzero(self.y > self.height)
+        if len(gone):
+            self.y[gone] -= self.height + self.rng.uniform(0, self.height / 4, len(gone))
+            self.x[gone] = self.rng.integers(2, self.width - 2, len(gone))
+
+    def map_colors(self, surface):
+        """Colores en el formato de píxel de `surface` (se recalcula si cambia)."""
+        shifts, losses = surface.get_shifts(), surface.get_losses()
+        if self.format != (shifts, losses):
+            self.format = (shifts, losses)
+            mapped = np.full(self.count, surface.get_masks()[3], dtype=np.uint32)
+            for channel in range(3):
+                mapped |= (self.rgb[:, channel] >> losses[channel]) << shifts[channel]
+            self.mapped = mapped
+        return self.mapped
+
+    def draw(self, renderer):
+        surface = renderer.surface
+        height = surface.get_height()
+        colors = self.map_colors(surface)
+        x = self.x
+        y = self.y.astype(np.intp)
+        # Solo las que caben enteras; las del borde entran o salen un frame antes
+        inside = (y >= 2) & (y < height - 2)
+        pixels = pygame.surfarray.pixels2d(surface)
+        try:
+            for size, offsets in SHAPES.items():
+                chosen = inside & self.of_size[size]
+                sx, sy, sc = x[chosen], y[chosen], colors[chosen]
+                for dx, dy in offsets:
+                    pixels[sx + dx, sy + dy] = sc
+        finally:
+            del pixels  # Suelta el bloqueo de la superficie
+        if self.count > MARK_LIMIT:
+            renderer.mark(surface.get_rect())
+        else:
+            for i in np.flatnonzero(inside).tolist():
+                size = int(self.size[i])
+                renderer.mark(pygame.Rect(int(x[i]) - size, int(y[i]) - size, 2 * size, 2 * size))
+
+
+def from_env(size=(800, 600)):
+    """El fondo de estrellas para la partida si SPACE_INVADERS_STARS lo pide, o None."""
+    count = int(os.environ.get('SPACE_INVADERS_STARS') or 0)
+    return Starfield(count, size) if count > 0 else None
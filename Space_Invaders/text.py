@@ -0,0 +1,65 @@
+"""Texto del HUD a partir de un atlas de glifos.
+
+`font.render` rasteriza con FreeType en cada llamada. Aquí cada glifo de la
+fuente se rasteriza una sola vez por tamaño y color en un atlas, y las
+cadenas se componen con un blit por carácter. Además, las cadenas ya
+compuestas se guardan por valor, así que repetir "Score: 120" en cada frame
+no cuesta nada hasta que cambia el marcador.
+"""
+from collections import OrderedDict
+
+import pygame
+
+ATLAS_CHARS = ''.join(chr(c) for c in range(32, 127)) + '¡¿ÁÉÍÓÚÑÜáéíóúñü'
+
+
+class GlyphAtlas:
+    def __init__(self, font_path, size, cache_size=256):
+        self.font = pygame.font.Font(font_path, size)
+        self.height = self.font.get_height()
+        self.cache_size = cache_size
+        self.glyphs = {}  # color -> {carácter: subsuperficie del atlas}
+        self.strings = OrderedDict()  # (texto, color) -> superficie compuesta
+
+    def _build(self, color):
+        surfaces = [self.font.render(ch, True, color) for ch in ATLAS_CHARS]
+        atlas = pygame.Surface((sum(s.get_width() for s in surfaces), self.height), pygame.SRCALPHA)
+        glyphs = {}
+        x = 0
+        for ch, surface in zip(ATLAS_CHARS, surfaces):
+            atlas.blit(surface, (x, 0))
+            glyphs[ch] = atlas.subsurface((x, 0, surface.get_width(), self.height))
+            x += surface.get_width()
+        self.glyphs[color] = glyphs
+        return glyphs
+
+    def glyph(self, ch, color):
+        glyphs = self.glyphs.get(color) or self._build(color)
+        surface = glyphs.get(ch)
+        if surface is None:
+            # Carácter fuera del atlas: se rasteriza una vez y se guarda
+            surface = glyphs[ch] = self.font.render(ch, True, color)
+        return surface
+
+    def size(self, text):
+        return (sum(self.glyph(ch, (255, 255, 255)).get_width() for ch in text), self.height)
+
+    def render(self, text, color):
+        key = (text, tuple(color))
+        surface = self.strings.get(key)
+        if surface is not None:
+            self.strings.move_to_end(key)
+            return surface
+
+        color = key[1]
+        glyphs = [self.glyph(ch, color) for ch in text]
+        surface = pygame.Surface((max(1, sum(g.get_width() for g in glyphs)), self.height), pygame.SRCALPHA)
+        x = 0
+        for g in glyphs:
+            surface.blit(g, (x, 0), special_flags=pygame.BLEND_RGBA_MAX)
+            x += g.get_width()
+
+        self.strings[key] = surface
+        if len(self.strings) > self.cache_size:
+            self.strings.popitem(last=False)
+        return surface
@@ -0,0 +1,30 @@
+"""Bucle de paso fijo para la simulación.
+
+La simulación avanza siempre en ticks de la misma duración, sin importar a
+cuántos FPS se dibuje: cada frame se suma el tiempo real transcurrido a un
+acumulador y se simulan tantos ticks como quepan. Lo que sobra (`alpha`,
+entre 0 y 1) sirve para interpolar las posiciones al dibujar.
+"""
+
+
+class FixedTimestep:
+    def __init__(self, tick_rate=60, max_steps=5):
+        self.dt = 1.0 / tick_rate
+        self.max_steps = max_steps  # Tope de ticks por frame
+        self.accumulator = 0.0
+        self.alpha = 0.0
+        self.dropped = 0  # Ticks descartados por el tope
+
+    def advance(self, elapsed):
+        """Suma `elapsed` segundos y devuelve cuántos ticks hay que simular."""
+        self.accumulator += elapsed
+        steps = int(self.accumulator / self.dt)
+        if steps > self.max_steps:
+            # Evita la espiral de la muerte: si un frame tarda demasiado no se
+            # intenta recuperar todo el tiempo perdido, el juego va más lento
+            self.dropped += steps - self.max_steps
+            steps = self.max_steps
+            self.accumulator = steps * self.dt
+        self.accumulator -= steps * self.dt
+        self.alpha = self.accumulator / self.dt
+        return steps